@@ -13,11 +13,22 @@ Script to build a SpineOpt model from Backbone format data on SpineDB base.
 
 import sys
 import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from gdx2spinedb import io_config
 from gdx2spinedb.import_ts import SpineDBImporter, generate_time_index
+from gdx2spinedb.export_index import as_export_index
+from gdx2spinedb.relationship_graph import relationship_graph
+from gdx2spinedb.time_index import time_labels
+from gdx2spinedb.time_series import time_series_value
 
 timeseries_repeat = False
 
+# read-only state of the worker processes of a parallel conversion, see __convert_in_parallel()
+_worker_state = dict()
+
 
 def operating_time(func):
     def wrapper(*x):
@@ -33,15 +44,21 @@ def operating_time(func):
 
 def __restore_fuel_price_map(_bb_spine_db_export: dict, _node_name: str, _alternative='Base'):
     """
-
+    restore absolute fuel prices from the price changes of BB_gdx ts_priceChange,
+    the changes are scattered into an hourly array from t000000 to the last index and summed up cumulatively;
+    the result is memoized per fuel node in the cache of the export index, hence it is read-only
     :param _bb_spine_db_export:
     :param _node_name:
     :param _alternative:
-    :return: a dictionary of fuel prices with time stamps, EUR/MWh ?
+    :return: an array of fuel prices from t000000 on, EUR/MWh ?, or None if the node has no ts_priceChange
+    :raises ValueError: the ts_priceChange of the node has no initial price at t000000
     """
+    _bb_index = as_export_index(_bb_spine_db_export)
+    _key = ("fuel_price", _node_name)
+    if _key in _bb_index.cache:
+        return _bb_index.cache[_key]
     _fuel_price = [
-        x[3] for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'ts_priceChange', _node_name in x[1]])
+        x[3] for x in _bb_index.with_member('relationship_parameter_values', 'ts_priceChange', _node_name)
     ]
     if _fuel_price:
         _fuel_price_map = _fuel_price[0]
@@ -49,24 +66,29 @@ def __restore_fuel_price_map(_bb_spine_db_export: dict, _node_name: str, _altern
         print(f"price for {_node_name} not found")
         return None
 
-    _fuel_price = [{f"t{0:06d}": _fuel_price_map.get_value(f"t{0:06d}")}]
-    for i in range(1, int(_fuel_price_map.indexes[-1][1:]) + 1):
-        _index = f"t{i:06d}"
-        _value_before = _fuel_price[i - 1][f"t{i - 1:06d}"]
-        if _fuel_price_map.get_value(_index):
-            _value = _value_before + _fuel_price_map.get_value(_index)
-        else:
-            _value = _value_before
-        _fuel_price += [{_index: _value}]
-    _fuel_price = {k: v for d in _fuel_price for k, v in d.items()}
+    # the position of a change is the hour of its index, e.g. 't000042'
+    _hours = np.fromiter((int(x[1:]) for x in _fuel_price_map.indexes), dtype=np.int64)
+    _changes = np.asarray(_fuel_price_map.values, dtype=np.float64)
+    if not np.any(_hours == 0):
+        # the changes cannot be summed up to prices without the initial one
+        raise ValueError(f"ts_priceChange of node {_node_name} has no initial price at t000000")
+    _fuel_price = np.zeros(int(_fuel_price_map.indexes[-1][1:]) + 1)
+    # the first change of an hour counts, as with Map.get_value()
+    _hours, _first = np.unique(_hours, return_index=True)
+    _in_range = _hours < len(_fuel_price)
+    _fuel_price[_hours[_in_range]] = _changes[_first[_in_range]]
+    _fuel_price = np.cumsum(_fuel_price)
+    _fuel_price.flags.writeable = False
+    _bb_index.cache[_key] = _fuel_price
     return _fuel_price
 
 
 def __get_number_of_units(_bb_spine_db_export: dict, *_unit_names: str, default: int = 1) -> list:
+    _bb_index = as_export_index(_bb_spine_db_export)
     numbers = list()
     for _unit_name in _unit_names:
         bb_unit_count = [
-            x[3] for x in _bb_spine_db_export['object_parameter_values'] if x[:3] == ('unit', _unit_name, 'unitCount')
+            x[3] for x in _bb_index.with_prefix('object_parameter_values', 'unit', _unit_name) if x[2] == 'unitCount'
         ]
         if not bb_unit_count:
             numbers.append(default)
@@ -120,21 +142,27 @@ def demand_time_series(_bb_spine_db_export: dict, _grid_name: str, _node_name: s
     :return:
     """
     _temp_importer = SpineDBImporter()
+    _bb_index = as_export_index(_bb_spine_db_export)
 
     if _auto_alternative:
         parameter_scenarios = [
-            x for x in _bb_spine_db_export['relationship_parameter_values']
-            if all([x[0] == 'ts_grid__node__f', x[1][:2] == [_grid_name, _node_name], x[2] == 'ts_influx'])
+            x for x in _bb_index.with_prefix(
+                'relationship_parameter_values', 'ts_grid__node__f', _grid_name, _node_name
+            )
+            if x[2] == 'ts_influx'
         ]
     else:
         parameter_scenarios = [
-            x for x in _bb_spine_db_export['relationship_parameter_values'] for alt in alternatives
-            if all([x[0] == 'ts_grid__node__f', x[1] == [_grid_name, _node_name, alt], x[2] == 'ts_influx'])
+            x for alt in alternatives
+            for x in _bb_index.with_prefix(
+                'relationship_parameter_values', 'ts_grid__node__f', _grid_name, _node_name, alt
+            )
+            if x[2] == 'ts_influx'
         ]
     _has_base_alternative = True
     if any([
             not _base_alternative,
-            all([_base_alternative not in x[1] for x in _bb_spine_db_export['relationship_parameter_values']])
+            not _bb_index.has_member('relationship_parameter_values', _base_alternative)
     ]):
         _has_base_alternative = False
         print(f"No alternative was specified as the Base or the alternative {_base_alternative} does not exist")
@@ -147,30 +175,45 @@ def demand_time_series(_bb_spine_db_export: dict, _grid_name: str, _node_name: s
     # add node__commodity relationship
     _temp_importer.relationships.append(("node__commodity", (_node_name, _grid_name)))
 
-    _time_index = [str(x) for x in _time_index]
-
     for alt in parameter_scenarios:
         # spinedb_api.parameter_value.Map is a list
         # the following map.values[] method is unnecessary for the value list aligning with the _time_index
         # but it provides a method to slice the data, which can be useful in the future
-        __demand = [-x for x in alt[3].values[:len(_time_index)]]
-        # zip(a, b) takes only the common parts between a and b aligning from the first element
-        __demand = dict(zip(_time_index, __demand))
+        __demand = -np.asarray(alt[3].values[:len(_time_index)], dtype=float)
+        # values and _time_index are aligned from the first element, the longer one is truncated
+        __demand = time_series_value(_time_index, __demand, repeat=timeseries_repeat)
         if _has_base_alternative and _base_alternative == alt[1][2]:
             _temp_importer.object_parameter_values += [
-                ("node", _node_name, "demand",
-                 {"type": "time_series", "data": __demand, "index": {"repeat": timeseries_repeat}}, 'Base'),
+                ("node", _node_name, "demand", __demand, 'Base'),
             ]
         else:
             _temp_importer.object_parameter_values += [
-                ("node", _node_name, "demand",
-                 {"type": "time_series", "data": __demand, "index": {"repeat": timeseries_repeat}}, alt[1][2]),
+                ("node", _node_name, "demand", __demand, alt[1][2]),
             ]
             if (alt[1][2]) not in _temp_importer.alternatives:
                 _temp_importer.alternatives.append(alt[1][2])
     return _temp_importer
 
 
+def __capacity_factor_matrix(parameter_scenarios, _time_index) -> tuple:
+    """
+    capacity factors of all alternatives as one (alternatives x time steps) matrix, values of no more than 10e-300
+    in magnitude and NaN values are set to 0.0, the steps after the end of a shorter series are NaN
+    :param parameter_scenarios: parameter value rows with a time series value, e.g. of ts_cf
+    :param _time_index: pandas DatetimeIndex, the series are truncated to its length
+    :return: a tuple of the matrix and the length of each series
+    """
+    _matrix = np.full((len(parameter_scenarios), len(_time_index)), np.nan)
+    _lengths = list()
+    for i, alt in enumerate(parameter_scenarios):
+        _values = np.array(alt[3].values[:len(_time_index)], dtype=float)
+        # as x if abs(x) > 10e-300 else 0, which also zeroes NaN values
+        _values[~(np.abs(_values) > 10e-300)] = 0.0
+        _matrix[i, :len(_values)] = _values
+        _lengths.append(len(_values))
+    return _matrix, _lengths
+
+
 def capacity_factor_time_series(_bb_spine_db_export: dict, _flow_name: str, _node_name: str, _grid_name: str,
                                 _time_index, *alternatives,
                                 _auto_alternative=True, _base_alternative: str = None, _mode="node",
@@ -191,28 +234,30 @@ def capacity_factor_time_series(_bb_spine_db_export: dict, _flow_name: str, _nod
     :return:
     """
     _temp_importer = SpineDBImporter()
+    _bb_index = as_export_index(_bb_spine_db_export)
 
     # from BB_gdx ts_cf (SpineDB ts_flow__node__f)
     if _auto_alternative:
         parameter_scenarios = [
-            x for x in _bb_spine_db_export['relationship_parameter_values']
-            if all([x[0] == 'ts_flow__node__f', _flow_name in x[1], _node_name in x[1], x[2] == 'ts_cf'])
+            x for x in _bb_index.with_member('relationship_parameter_values', 'ts_flow__node__f', _flow_name)
+            if all([_node_name in x[1], x[2] == 'ts_cf'])
         ]
     else:
         parameter_scenarios = [
-            x for x in _bb_spine_db_export['relationship_parameter_values'] for alt in alternatives
-            if all([x[0] == 'ts_flow__node__f', x[1] == [_flow_name, _node_name, alt], x[2] == 'ts_cf'])
+            x for alt in alternatives
+            for x in _bb_index.with_prefix(
+                'relationship_parameter_values', 'ts_flow__node__f', _flow_name, _node_name, alt
+            )
+            if x[2] == 'ts_cf'
         ]
     _has_base_alternative = True
     if any([
             not _base_alternative,
-            all([_base_alternative not in x[1] for x in _bb_spine_db_export['relationship_parameter_values']])
+            not _bb_index.has_member('relationship_parameter_values', _base_alternative)
     ]):
         _has_base_alternative = False
         print(f"No alternative was specified as the Base or the alternative {_base_alternative} does not exist")
 
-    _time_index = [str(x) for x in _time_index]
-
     # inconsistent terms for wind: 'Wind' for flow and unit names in main database, 'wind' for ts_cf in forecast
     _flow_name_for_units = _flow_name
     if _flow_name == 'wind':
@@ -220,13 +265,16 @@ def capacity_factor_time_series(_bb_spine_db_export: dict, _flow_name: str, _nod
 
     # find the corresponding units as per BB_gdx flowUnit (SpineDB flow__unit)
     # can be multiple units to one flow, e.g. units 75FI_PV and 75FI_PV2 to the same PV flow
+    _bb_graph = relationship_graph(_bb_index)
     _unit_names = list(
-        set([x[1][1] for x in _bb_spine_db_export['relationships'] if
-             all([x[0] == 'flow__unit', _flow_name_for_units in x[1]])])
+        set([x[1] for x in _bb_graph.containing('flow__unit', _flow_name_for_units)])
         &
-        set([x[1][2] for x in _bb_spine_db_export['relationships']
-             if all([x[0] == 'grid__node__unit__io', x[1][:2] == [_grid_name, _node_name]])])
+        set(_bb_graph.objects('grid__node__unit__io', 2, _grid_name, _node_name))
     )
+    # alternatives x time steps
+    _capacity_factors, _lengths = __capacity_factor_matrix(parameter_scenarios, _time_index)
+    _is_base = [_has_base_alternative and _base_alternative == alt[1][2] for alt in parameter_scenarios]
+    _alternative_names = ['Base' if _base else alt[1][2] for alt, _base in zip(parameter_scenarios, _is_base)]
 
     if _mode == "node":
         # flow in bb_format translated as commodity in spineopt
@@ -236,18 +284,22 @@ def capacity_factor_time_series(_bb_spine_db_export: dict, _flow_name: str, _nod
         _capacity_values = list(
             map(
                 lambda _unit_name:
-                [x[3] for x in _bb_spine_db_export['relationship_parameter_values']
-                 if all([x[0] == 'grid__node__unit__io', x[1][:3] == [_grid_name, _node_name, _unit_name],
-                         x[2] == 'capacity'])],
+                [x[3] for x in _bb_index.with_prefix(
+                    'relationship_parameter_values', 'grid__node__unit__io', _grid_name, _node_name, _unit_name
+                ) if x[2] == 'capacity'],
                 _unit_names
             )
         )
-        _number_of_units = __get_number_of_units(_bb_spine_db_export, *_unit_names, default=1)
-        _unit__capacity = dict(zip(_unit_names, list(zip(_capacity_values, _number_of_units))))
+        # units x alternatives, the i-th capacity of a unit scales the capacity factor of the i-th alternative
+        _capacities = np.array(
+            [[_capacity[i] for i in range(len(parameter_scenarios))] for _capacity in _capacity_values], dtype=float
+        ).reshape(len(_unit_names), len(parameter_scenarios))
+        # source flows of all units and alternatives in one broadcast, units x alternatives x time steps
+        _source_flows = -_capacity_factors[np.newaxis, :, :] * _capacities[:, :, np.newaxis]
 
         # create relationship and its value for flows from source to the unit
         # use unit_constraint approach
-        for _unit_name in _unit_names:
+        for u, _unit_name in enumerate(_unit_names):
             # create a name for the unit_constraint
             _unit_constraint_name = f"Eff_{_unit_name}"
             # create an additional node for source
@@ -266,34 +318,27 @@ def capacity_factor_time_series(_bb_spine_db_export: dict, _flow_name: str, _nod
                 ("unit__from_node__unit_constraint", (_unit_name, _source_node_name, _unit_constraint_name),
                  "unit_flow_coefficient", 1.0, 'Base'),
             ]
-            for i, alt in enumerate(parameter_scenarios):
-                __capacity_factor = [x if abs(x) > 10e-300 else 0 for x in alt[3].values[:len(_time_index)]]
-                __source_flow = [-x * _unit__capacity[_unit_name][0][i] for x in __capacity_factor]
-                __source_flow = dict(zip(_time_index, __source_flow))
-                if _has_base_alternative and _base_alternative == alt[1][2]:
-                    _temp_importer.object_parameter_values += [
-                        (
-                            "node", _source_node_name, "demand",
-                            {"type": "time_series", "data": __source_flow, "index": {"repeat": timeseries_repeat}},
-                            'Base'
-                        ),
-                    ]
-                else:
-                    _temp_importer.object_parameter_values += [
-                        (
-                            "node", _source_node_name, "demand",
-                            {"type": "time_series", "data": __source_flow, "index": {"repeat": timeseries_repeat}},
-                            alt[1][2]
-                        ),
-                    ]
-                    if (alt[1][2]) not in _temp_importer.alternatives:
-                        _temp_importer.alternatives.append(alt[1][2])
+            for i, _alternative in enumerate(_alternative_names):
+                __source_flow = time_series_value(
+                    _time_index, _source_flows[u, i, :_lengths[i]], repeat=timeseries_repeat
+                )
+                _temp_importer.object_parameter_values += [
+                    ("node", _source_node_name, "demand", __source_flow, _alternative),
+                ]
+                if not _is_base[i] and _alternative not in _temp_importer.alternatives:
+                    _temp_importer.alternatives.append(_alternative)
     if _mode == "unit":
+        # the capacity factors are the same for all units
+        _capacity_factor_values = [
+            time_series_value(_time_index, _capacity_factors[i, :_lengths[i]], repeat=timeseries_repeat)
+            for i in range(len(parameter_scenarios))
+        ]
         for _unit_name in _unit_names:
             _direction = [
                 "to_node" if x[1][3] == "output" else "from_node"
-                for x in _bb_spine_db_export['relationships']
-                if all([x[0] == 'grid__node__unit__io', x[1][:3] == [_grid_name, _node_name, _unit_name]])
+                for x in _bb_index.with_prefix(
+                    'relationships', 'grid__node__unit__io', _grid_name, _node_name, _unit_name
+                )
             ][0]
             # create an artificial source node with a dummy inflow unit
             if _direction == "from_node":
@@ -303,25 +348,13 @@ def capacity_factor_time_series(_bb_spine_db_export: dict, _flow_name: str, _nod
                     _temp_importer, _source_node_name, f"Inflow_{_source_node_name}", "to_node"
                 )
             _temp_importer.relationships.append((f"unit__{_direction}", (_unit_name, _node_name)))
-            for alt in parameter_scenarios:
-                __capacity_factor = [x if abs(x) > 10e-300 else 0 for x in alt[3].values[:len(_time_index)]]
-                __capacity_factor = dict(zip(_time_index, __capacity_factor))
-                if _has_base_alternative and _base_alternative == alt[1][2]:
-                    _temp_importer.relationship_parameter_values += [
-                        (
-                            f"unit__{_direction}", [_unit_name, _node_name], "unit_conv_cap_to_flow",
-                            {"type": "time_series", "data": __capacity_factor, "index": {"repeat": timeseries_repeat}},
-                            'Base'
-                        ),
-                    ]
-                else:
-                    _temp_importer.relationship_parameter_values += [
-                        (
-                            f"unit__{_direction}", [_unit_name, _node_name], "unit_conv_cap_to_flow",
-                            {"type": "time_series", "data": __capacity_factor, "index": {"repeat": timeseries_repeat}},
-                            alt[1][2]
-                        ),
-                    ]
+            _temp_importer.relationship_parameter_values += [
+                (
+                    f"unit__{_direction}", [_unit_name, _node_name], "unit_conv_cap_to_flow",
+                    __capacity_factor, _alternative
+                )
+                for __capacity_factor, _alternative in zip(_capacity_factor_values, _alternative_names)
+            ]
     return _temp_importer
 
 
@@ -344,29 +377,23 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
     :return:
     """
     _temp_importer = SpineDBImporter()
+    _bb_index = as_export_index(_bb_spine_db_export)
 
     # Parameters 1: from BB_gdx p_gnu_io (SpineDB grid__node__unit__io)
-    _parameters_1 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'grid__node__unit__io', x[1][:3] == [_grid_name, _node_name, _unit_name]])
-    ]
+    _parameters_1 = _bb_index.with_prefix(
+        'relationship_parameter_values', 'grid__node__unit__io', _grid_name, _node_name, _unit_name
+    )
     _fuel_commodity = [
-        x[1][0] for x in _bb_spine_db_export['relationships'] if x[0] == 'commodity'
+        x[1][0] for x in _bb_index.rows('relationships', 'commodity')
     ]
     _unit_capacity = 0
 
     # Parameters 2: from BB_gdx effLevelGroupUnit (SpineDB efflevel__group__unit)
     # unit_online_type
-    _parameters_2 = [
-        x for x in _bb_spine_db_export['relationships']
-        if all([x[0] == 'efflevel__group__unit', _unit_name in x[1]])
-    ]
+    _parameters_2 = _bb_index.with_member('relationships', 'efflevel__group__unit', _unit_name)
 
     # Parameters 3: from BB_gdx p_unit (SpineDB unit)
-    _parameters_3 = [
-        x for x in _bb_spine_db_export['object_parameter_values']
-        if all([x[0] == 'unit', x[1] == _unit_name])
-    ]
+    _parameters_3 = _bb_index.with_prefix('object_parameter_values', 'unit', _unit_name)
 
     # Translate Parameter 1
     # TODO: other bb parameter under the category p_gnu_io, unitSize for investment
@@ -379,7 +406,7 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
 
             if par[2] == 'capacity':
                 # capacity is aggregated in Backbone but SpineOpt requires unit capacity
-                _number_of_units = __get_number_of_units(_bb_spine_db_export, _unit_name, default=1)
+                _number_of_units = __get_number_of_units(_bb_index, _unit_name, default=1)
                 _unit_capacity = par[3] / _number_of_units[0]
                 _temp_importer.relationship_parameter_values += [
                     ("unit__to_node", [_unit_name, _node_name], "unit_capacity", _unit_capacity, _alternative),
@@ -400,7 +427,7 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
             # build parameters
             if par[2] == 'capacity':
                 # capacity is aggregated in Backbone but SpineOpt requires unit capacity
-                _number_of_units = __get_number_of_units(_bb_spine_db_export, _unit_name, default=1)
+                _number_of_units = __get_number_of_units(_bb_index, _unit_name, default=1)
                 _unit_capacity = par[3] / _number_of_units[0]
                 _temp_importer.relationship_parameter_values += [
                     ("unit__from_node", [_unit_name, _node_name], "unit_capacity", _unit_capacity, _alternative),
@@ -422,20 +449,17 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
                 )
 
                 # build fuel price, in either TimeSeries or constant value
-                _fuel_price_dict = __restore_fuel_price_map(_bb_spine_db_export, _node_name, _alternative=_alternative)
-                if len(_fuel_price_dict) != 1:
-                    __time_index = [str(x) for x in _time_index]
-                    _fuel_price_ts = dict(zip(__time_index, list(_fuel_price_dict.values())[:len(__time_index)]))
+                _fuel_prices = __restore_fuel_price_map(_bb_index, _node_name, _alternative=_alternative)
+                if len(_fuel_prices) != 1:
+                    _fuel_price_ts = time_series_value(
+                        _time_index, _fuel_prices[:len(_time_index)], repeat=timeseries_repeat
+                    )
                     _temp_importer.relationship_parameter_values += [
-                        (
-                            "unit__from_node", [_unit_name, _node_name], "fuel_cost",
-                            {"type": "time_series", "data": _fuel_price_ts, "index": {"repeat": timeseries_repeat}},
-                            _alternative
-                        ),
+                        ("unit__from_node", [_unit_name, _node_name], "fuel_cost", _fuel_price_ts, _alternative),
                     ]
                 # constant value
                 else:
-                    _fuel_price = list(_fuel_price_dict.values())[0]
+                    _fuel_price = float(_fuel_prices[0])
                     _temp_importer.relationship_parameter_values += [
                         ("unit__from_node", [_unit_name, _node_name], "fuel_cost", _fuel_price, _alternative),
                     ]
@@ -458,7 +482,7 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
                 ("unit", _unit_name, "online_variable_type", "unit_online_variable_type_linear", _alternative),
             )
         elif _unit_on[1][1] == 'directOff':
-            _number_of_units = __get_number_of_units(_bb_spine_db_export, _unit_name, default=1)
+            _number_of_units = __get_number_of_units(_bb_index, _unit_name, default=1)
             _temp_importer.object_parameter_values.append(
                 ("unit", _unit_name, "fix_units_on", _number_of_units[0], _alternative),
             )
@@ -569,10 +593,7 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
                 # MWh fuel/unit startup
                 _start_up_fuel_consumption = - par[3] * _unit_capacity
                 # Parameters 4: from BB_gdx p_uStartupfuel (SpineDB unit__startupFuel)
-                _parameters_4 = [
-                    x for x in _bb_spine_db_export['relationship_parameter_values']
-                    if all([x[0] == 'unit__startupFuel', _unit_name in x[1]])
-                ]
+                _parameters_4 = _bb_index.with_member('relationship_parameter_values', 'unit__startupFuel', _unit_name)
                 if _parameters_4:
                     # the corresponding fuel node for te startup fuel
                     _start_up_fuel = _parameters_4[0][1][1]
@@ -588,8 +609,7 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
                     # add commodity for the fuel node if there is any
                     # _startup_fuel_node shares the same commodity with the fuel node
                     _grid_for_fuel_commodity = [
-                        x[1][0] for x in _bb_spine_db_export['relationships']
-                        if all([x[0] == 'grid__node', _start_up_fuel in x[1]])
+                        x[0] for x in relationship_graph(_bb_index).containing('grid__node', _start_up_fuel)
                     ]
                     if _grid_for_fuel_commodity:
                         _fuel_commodity = _grid_for_fuel_commodity[0]
@@ -623,21 +643,20 @@ def unit_parameters(_bb_spine_db_export: dict, _grid_name: str, _node_name: str,
                     ]
 
                     # build fuel price, in either TimeSeries or constant value, if there is any
-                    _fuel_price_dict = __restore_fuel_price_map(
-                        _bb_spine_db_export, _start_up_fuel, _alternative=_alternative
+                    _fuel_prices = __restore_fuel_price_map(
+                        _bb_index, _start_up_fuel, _alternative=_alternative
                     )
-                    if len(_fuel_price_dict) != 1:
-                        __time_index = [str(x) for x in _time_index]
-                        _fuel_price_ts = dict(
-                            zip(__time_index, list(_fuel_price_dict.values())[:len(__time_index)]))
+                    if len(_fuel_prices) != 1:
+                        _fuel_price_ts = time_series_value(
+                            _time_index, _fuel_prices[:len(_time_index)], repeat=timeseries_repeat
+                        )
                         _temp_importer.relationship_parameter_values += [
-                            ("unit__from_node", [_unit_name, _startup_fuel_node], "fuel_cost",
-                             {"type": "time_series", "data": _fuel_price_ts, "index": {"repeat": timeseries_repeat}},
+                            ("unit__from_node", [_unit_name, _startup_fuel_node], "fuel_cost", _fuel_price_ts,
                              _alternative),
                         ]
                     # constant value
                     else:
-                        _fuel_price = list(_fuel_price_dict.values())[0]
+                        _fuel_price = float(_fuel_prices[0])
                         _temp_importer.relationship_parameter_values += [
                             ("unit__from_node", [_unit_name, _startup_fuel_node], "fuel_cost", _fuel_price,
                              _alternative),
@@ -656,19 +675,16 @@ def node_parameters(
         _bb_spine_db_export: dict, _grid_name: str, _node_name: str, _time_index, _alternative='Base', _node_rename=None
 ):
     _temp_importer = SpineDBImporter()
+    _bb_index = as_export_index(_bb_spine_db_export)
 
     # Parameters 1: from BB_gdx p_gn (SpineDB grid__node)
-    _parameters_1 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'grid__node', x[1] == [_grid_name, _node_name]])
-    ]
+    _parameters_1 = _bb_index.with_prefix('relationship_parameter_values', 'grid__node', _grid_name, _node_name)
     # Parameters 2: from BB_gdx p_gnBoundaryPropertiesForStates (SpineDB grid__node__boundary)
-    _parameters_2 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'grid__node__boundary', x[1][:2] == [_grid_name, _node_name]])
-    ]
+    _parameters_2 = _bb_index.with_prefix(
+        'relationship_parameter_values', 'grid__node__boundary', _grid_name, _node_name
+    )
 
-    _time_index = [str(x) for x in _time_index]
+    _time_index = time_labels(_time_index)
 
     if _node_rename:
         _node_name = _node_rename
@@ -740,6 +756,136 @@ def node_parameters(
     return _temp_importer
 
 
+def __spec_arguments(spec) -> tuple:
+    """
+    :param spec: names of a batch conversion, optionally followed by a dictionary of keyword arguments,
+                 e.g. ('elec', '75FI', '75FI_PV2', {'_eff_level': 2})
+    :return: a tuple of the names and a dictionary of the keyword arguments
+    """
+    if spec and isinstance(spec[-1], dict):
+        return tuple(spec[:-1]), spec[-1]
+    return tuple(spec), dict()
+
+
+def __init_worker(_bb_index, _time_index):
+    _worker_state.update(bb_index=_bb_index, time_index=_time_index)
+
+
+def __convert_chunk(_function, _specs, _kwargs):
+    """
+    convert a chunk of specs in a worker process against the export shared with the worker
+    """
+    return _function(_worker_state['bb_index'], _specs, _worker_state['time_index'], **_kwargs)
+
+
+def __convert_in_parallel(_function, _bb_index, specs, _time_index, max_workers, **_kwargs):
+    """
+    map a batch conversion over contiguous chunks of specs in worker processes and merge the chunks in order
+    the export and the time index are handed to each worker once, inherited when processes are forked on Linux,
+    otherwise pickled once per worker by the initializer, only the specs and the importers travel per task;
+    the indexes of the export and its relationship graph are built beforehand so that workers do not rebuild them,
+    and the caller must not hold an open database session, which forked workers would inherit
+    :param _function: convert_nodes or convert_units
+    :param _bb_index: an instance of gdx2spinedb.export_index.ExportIndex
+    :param specs: see convert_nodes() and convert_units()
+    :param _time_index: a pandas DatetimeIndex
+    :param max_workers: number of processes, None for the number of processors
+    :param _kwargs: other keyword arguments of the function
+    :return: an instance of gdx2spinedb.import_ts.SpineDBImporter, identical to the one of a serial conversion
+             since SpineDBImporter.update() of consecutive chunks keeps the first positions and the last values
+    """
+    specs = list(specs)
+    _n_chunks = max(1, min(len(specs), 4 * (max_workers or multiprocessing.cpu_count())))
+    _chunks = [specs[i * len(specs) // _n_chunks:(i + 1) * len(specs) // _n_chunks] for i in range(_n_chunks)]
+    _bb_index.build()
+    relationship_graph(_bb_index).index_classes()
+    # fork is unsafe on macOS, where system libraries may hold locks or threads in the parent
+    if sys.platform.startswith('linux'):
+        _context = multiprocessing.get_context('fork')
+        _initializer, _initargs = None, ()
+        # the forked workers inherit the state as of the creation of the pool
+        __init_worker(_bb_index, _time_index)
+    else:
+        _context = None
+        _initializer, _initargs = __init_worker, (_bb_index, _time_index)
+    _temp_importer = SpineDBImporter()
+    try:
+        with ProcessPoolExecutor(max_workers, mp_context=_context, initializer=_initializer,
+                                 initargs=_initargs) as _executor:
+            # the importers come in the order of the chunks
+            for _chunk_importer in _executor.map(__convert_chunk, repeat(_function), _chunks, repeat(_kwargs)):
+                _temp_importer.update(_chunk_importer)
+    finally:
+        _worker_state.clear()
+    return _temp_importer
+
+
+def convert_nodes(_bb_spine_db_export: dict, node_specs, _time_index, _alternative='Base', _demand=None,
+                  max_workers=1):
+    """
+    convert many nodes into one importer, per node as node_parameters() and optionally demand_time_series() before,
+    the export is indexed once, i.e. the Backbone tables are grouped by grid and node in one pass and shared by all nodes
+    :param _bb_spine_db_export: a export dictionary for spineDB, obtained via spineDB.export_spinedb()
+    :param node_specs: iterable of (grid, node) tuples, optionally followed by keyword arguments of node_parameters(),
+                       e.g. ('heat', '75FI_heat', {'_node_rename': 'heat_75FI'})
+    :param _time_index: a pandas DatetimeIndex, which can be generated by gdx2spinedb.import_ts
+    :param _alternative:
+    :param _demand: None for no demand, or keyword arguments of demand_time_series() with its positional alternatives
+                    under 'alternatives', e.g. {'alternatives': ['f00'], '_auto_alternative': False}
+    :param max_workers: number of processes converting the nodes in parallel, None for the number of processors,
+                        1 to convert them one after another in this process, the result is the same either way
+    :return: an instance of gdx2spinedb.import_ts.SpineDBImporter,
+             a later value replaces an earlier one of the same key as with separate imports
+    """
+    _bb_index = as_export_index(_bb_spine_db_export)
+    if max_workers != 1:
+        return __convert_in_parallel(
+            convert_nodes, _bb_index, node_specs, _time_index, max_workers, _alternative=_alternative, _demand=_demand
+        )
+    _temp_importer = SpineDBImporter()
+    _demand_kwargs = dict(_demand or {})
+    _demand_alternatives = _demand_kwargs.pop('alternatives', ())
+    for spec in node_specs:
+        (_grid_name, _node_name), _kwargs = __spec_arguments(spec)
+        if _demand is not None:
+            _temp_importer.update(demand_time_series(
+                _bb_index, _grid_name, _node_name, _time_index, *_demand_alternatives,
+                **{'_node_rename': _kwargs.get('_node_rename'), **_demand_kwargs}
+            ))
+        _temp_importer.update(node_parameters(
+            _bb_index, _grid_name, _node_name, _time_index, **{'_alternative': _alternative, **_kwargs}
+        ))
+    return _temp_importer
+
+
+def convert_units(_bb_spine_db_export: dict, unit_specs, _time_index, _alternative='Base', max_workers=1):
+    """
+    convert many units into one importer, per unit as unit_parameters(),
+    the export is indexed once, i.e. the Backbone tables are grouped by grid, node and unit in one pass
+    and shared by all units, as are the restored fuel prices per fuel node
+    :param _bb_spine_db_export: a export dictionary for spineDB, obtained via spineDB.export_spinedb()
+    :param unit_specs: iterable of (grid, node, unit) tuples, optionally followed by keyword arguments of
+                       unit_parameters(), e.g. ('elec', '75FI', '75FI_Nuclear', {'_p_unit': True})
+    :param _time_index: used only for time-variant fuel prices
+    :param _alternative:
+    :param max_workers: see convert_nodes()
+    :return: an instance of gdx2spinedb.import_ts.SpineDBImporter,
+             a later value replaces an earlier one of the same key as with separate imports
+    """
+    _bb_index = as_export_index(_bb_spine_db_export)
+    if max_workers != 1:
+        return __convert_in_parallel(
+            convert_units, _bb_index, unit_specs, _time_index, max_workers, _alternative=_alternative
+        )
+    _temp_importer = SpineDBImporter()
+    for spec in unit_specs:
+        (_grid_name, _node_name, _unit_name), _kwargs = __spec_arguments(spec)
+        _temp_importer.update(unit_parameters(
+            _bb_index, _grid_name, _node_name, _unit_name, _time_index, **{'_alternative': _alternative, **_kwargs}
+        ))
+    return _temp_importer
+
+
 def unit_bi_inputs_outputs(_bb_spine_db_export: dict, _unit_name: str, _node_name_1: str, _node_name_2: str,
                            _direction="auto", _alternative='Base', _create_structure=True):
     """
@@ -759,29 +905,24 @@ def unit_bi_inputs_outputs(_bb_spine_db_export: dict, _unit_name: str, _node_nam
     :return:
     """
     _temp_importer = SpineDBImporter()
+    _bb_index = as_export_index(_bb_spine_db_export)
 
     # Parameters 1: from BB_gdx p_unitConstraint (SpineDB unit__constraint)
-    _parameters_1 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'unit__constraint', _unit_name in x[1]])
-    ]
+    _parameters_1 = _bb_index.with_member('relationship_parameter_values', 'unit__constraint', _unit_name)
     # Parameters 2: from BB_gdx p_unitConstraintNode (SpineDB unit__constraint__node)
     _parameters_2 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all(
-            [x[0] == 'unit__constraint__node', _unit_name in x[1], any([_node_name_1 in x[1], _node_name_2 in x[1]])]
-        )
+        x for x in _bb_index.with_member('relationship_parameter_values', 'unit__constraint__node', _unit_name)
+        if any([_node_name_1 in x[1], _node_name_2 in x[1]])
     ]
 
     # check the consistency of flow directions
     if _direction == "auto":
+        # io of the relationships, each with parameter values from BB_gdx p_gnu_io
+        _bb_graph = relationship_graph(_bb_index)
         _direction = set([
-            x[1][3] for x in _bb_spine_db_export['relationship_parameter_values']
-            if all(
-                [x[0] == 'grid__node__unit__io',
-                 _unit_name in x[1],
-                 any([_node_name_1 in x[1], _node_name_2 in x[1]])]
-            )])
+            x[3] for _node_name in (_node_name_1, _node_name_2)
+            for x in _bb_graph.containing('grid__node__unit__io', _unit_name, _node_name)
+        ])
         if _direction == {"input", "output"}:
             print("Directions between the unit to the two specified nodes are inconsistent.\n"
                   "Check the source data or claim explicitly the SpineOpt directions as 'from_node' or 'to_node'.")
@@ -876,22 +1017,21 @@ def unit_emissions(_bb_spine_db_export: dict,
     :return:
     """
     _temp_importer = SpineDBImporter()
+    _bb_index = as_export_index(_bb_spine_db_export)
 
     # Parameters 1: from BB_gdx p_gnPolicy (SpineDB grid__node__policy__emission)
-    _parameters_1 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'grid__node__policy__emission', x[1][:2] == [_grid_name, _demand_node_name]])
-    ]
+    _parameters_1 = _bb_index.with_prefix(
+        'relationship_parameter_values', 'grid__node__policy__emission', _grid_name, _demand_node_name
+    )
     # e.g. emissionTax, EUR/tonne
     _emission_policy = 0
     if _parameters_1:
         _emission_policy = _parameters_1[0][3]
 
     # Parameters 2: from BB_gdx p_nEmission (SpineDB node__emission)
-    _parameters_2 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'node__emission', x[1] == [_fuel_node_name, _emission_name]])
-    ]
+    _parameters_2 = _bb_index.with_prefix(
+        'relationship_parameter_values', 'node__emission', _fuel_node_name, _emission_name
+    )
     # kg/MWh to tonne/MWh
     _emission_factor = 0
     if _parameters_2:
@@ -959,11 +1099,12 @@ def connection_for_node(_bb_spine_db_export: dict, _grid_name: str, _node_name_1
     :return:
     """
     _temp_importer = SpineDBImporter()
+    _bb_index = as_export_index(_bb_spine_db_export)
 
     # Parameters 1: from BB_gdx p_gnn (SpineDB grid__node__node)
     _parameters_1 = [
-        x for x in _bb_spine_db_export['relationship_parameter_values']
-        if all([x[0] == 'grid__node__node', _grid_name in x[1], _node_name_1 in x[1], _node_name_2 in x[1]])
+        x for x in _bb_index.with_member('relationship_parameter_values', 'grid__node__node', _grid_name)
+        if all([_node_name_1 in x[1], _node_name_2 in x[1]])
     ]
 
     # create background structure
@@ -988,12 +1129,8 @@ def connection_for_node(_bb_spine_db_export: dict, _grid_name: str, _node_name_1
         # overwrite the default ratio_out_in if there is any value specified in the source database
         if par[2] == 'transferLoss':
             _obj_list = [_connection_name] + par[1][1:]
-            # remove the created duplicate parameter value
-            _temp_importer.relationship_parameter_values = [
-                x for x in _temp_importer.relationship_parameter_values
-                if x != ("connection__node__node", _obj_list, "fix_ratio_out_in_connection_flow", 1.0, _alternative)
-            ]
-            _temp_importer.relationship_parameter_values.append(
+            _temp_importer.upsert(
+                "relationship_parameter_values",
                 ("connection__node__node", _obj_list, "fix_ratio_out_in_connection_flow", 1 - par[3], _alternative)
             )
         elif par[2] == 'transferCap':
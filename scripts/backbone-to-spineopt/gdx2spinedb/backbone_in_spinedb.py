@@ -139,6 +139,8 @@ n_parameter_values = output_db.import_relationship_parameter_values(relationship
 
 # Commit changes
 output_db.commit("Converted Backbone model")
+# Copy a staged database to the output url
+output_db.publish()
 
 print(f" {n_objects} objects")
 print(f" {n_object_values} object_values")
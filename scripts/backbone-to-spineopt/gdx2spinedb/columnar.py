@@ -0,0 +1,356 @@
+"""Module defines a columnar store for the parameter value rows of gdx2spinedb.import_ts.SpineDBImporter
+"""
+
+from array import array
+from collections.abc import MutableSequence
+
+import numpy as np
+from gdx2spinedb.time_series import ArrayTimeSeries
+
+# kinds of stored values
+_FLOAT, _INT, _TIME_SERIES, _OBJECT = range(4)
+
+
+class _Interner(object):
+    """Two-way mapping between hashable values and consecutive integer codes
+    """
+
+    def __init__(self):
+        self.codes = dict()
+        self.values = list()
+
+    def code(self, value) -> int:
+        _code = self.codes.get(value)
+        if _code is None:
+            _code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return _code
+
+
+class _Matrix(object):
+    """Growable 2-D float64 array holding time series values of one length, a row per time series
+    """
+
+    def __init__(self, width: int):
+        self.data = np.empty((0, width), dtype=np.float64)
+        self.n_rows = 0
+
+    def append(self, values) -> int:
+        """Add a row of values
+
+        Returns:
+            row (int): position of the row
+        """
+        if self.n_rows == len(self.data):
+            _data = np.empty((max(16, 2 * len(self.data)), self.data.shape[1]), dtype=np.float64)
+            _data[:self.n_rows] = self.data[:self.n_rows]
+            self.data = _data
+        self.data[self.n_rows] = values
+        self.n_rows += 1
+        return self.n_rows - 1
+
+    def __getstate__(self):
+        # leave the unused capacity out when pickled
+        return {"data": self.data[:self.n_rows], "n_rows": self.n_rows}
+
+
+class ColumnarValues(MutableSequence):
+    """Parameter value rows stored column-wise, a drop-in for the KeyedList of parameter values
+
+    Classes, entities, parameters and alternatives are interned as integer codes in arrays,
+    numbers in a float array and ArrayTimeSeries values as rows of a shared float matrix per series length.
+    Other values, e.g. strings, booleans or time series dictionaries, are kept as they are.
+    Rows are rebuilt as tuples on access, entities of relationships come back as tuples,
+    time series with a copy of their values, so that changing a returned row leaves the stored one as it is.
+    The storage of a replaced value is reused by the next value of the same kind (and length for time series).
+    As in a KeyedList there is one row per (class, entity, parameter, alternative), the first one wins on append.
+    """
+
+    # called with each row added by append() or upsert(), see KeyedList.on_added
+    on_added = None
+
+    def __init__(self, rows=()):
+        self._classes = _Interner()
+        self._entities = _Interner()
+        self._parameters = _Interner()
+        self._alternatives = _Interner()
+        self._series_indexes = _Interner()
+        self._class_codes = array('l')
+        self._entity_codes = array('l')
+        self._parameter_codes = array('l')
+        self._alternative_codes = array('l')
+        self._kinds = array('b')
+        self._slots = array('q')
+        self._scalars = array('d')
+        self._series_widths = array('l')
+        self._series_rows = array('q')
+        self._series_index_codes = array('l')
+        self._matrices = dict()
+        self._objects = list()
+        # slots of replaced values per store, see _free_value()
+        self._free_slots = dict()
+        self._positions = dict()
+        # keys of rows removed by take()
+        self._taken = set()
+        self.extend(rows)
+
+    def _key_codes(self, row, create=True):
+        """Codes of class, entity, parameter and alternative of a row, with None for values not interned yet
+        if not created. The alternative of a row without one is 'Base' as in a Spine database.
+        """
+        _entity = row[1] if isinstance(row[1], str) else tuple(row[1])
+        _alternative = row[4] if len(row) > 4 else "Base"
+        _values = (row[0], _entity, row[2], _alternative)
+        _interners = (self._classes, self._entities, self._parameters, self._alternatives)
+        if create:
+            return tuple(interner.code(value) for interner, value in zip(_interners, _values))
+        return tuple(interner.codes.get(value) for interner, value in zip(_interners, _values))
+
+    def key(self, row) -> tuple:
+        """Key of a row, i.e. the codes of (class, entity, parameter, alternative)
+        """
+        return self._key_codes(row)
+
+    def position(self, row):
+        """Position of the row with the same key as row, None if there is no such row
+        """
+        _codes = self._key_codes(row, create=False)
+        if None in _codes:
+            return None
+        return self._positions.get(_codes)
+
+    def _is_taken(self, row) -> bool:
+        _codes = self._key_codes(row, create=False)
+        return None not in _codes and _codes in self._taken
+
+    def _store_value(self, value):
+        """Store a value, in the slot of a replaced value of the same store if there is one
+
+        Returns:
+            kind (int), slot (int): kind of the value and its position in the respective store
+        """
+        if isinstance(value, float) or isinstance(value, int) and not isinstance(value, bool):
+            _kind = _FLOAT if isinstance(value, float) else _INT
+            _slot = self._reuse_slot("scalars")
+            if _slot is None:
+                self._scalars.append(value)
+                return _kind, len(self._scalars) - 1
+            self._scalars[_slot] = value
+            return _kind, _slot
+        if isinstance(value, ArrayTimeSeries):
+            _width = len(value.values)
+            _matrix = self._matrices.get(_width)
+            if _matrix is None:
+                _matrix = self._matrices[_width] = _Matrix(_width)
+            _index_code = self._series_indexes.code((value.start, value.resolution, value.repeat, value.ignore_year))
+            _slot = self._reuse_slot(("series", _width))
+            if _slot is None:
+                self._series_widths.append(_width)
+                self._series_rows.append(_matrix.append(value.values))
+                self._series_index_codes.append(_index_code)
+                return _TIME_SERIES, len(self._series_rows) - 1
+            _matrix.data[self._series_rows[_slot]] = value.values
+            self._series_index_codes[_slot] = _index_code
+            return _TIME_SERIES, _slot
+        _slot = self._reuse_slot("objects")
+        if _slot is None:
+            self._objects.append(value)
+            return _OBJECT, len(self._objects) - 1
+        self._objects[_slot] = value
+        return _OBJECT, _slot
+
+    @staticmethod
+    def _store(kind: int, slot: int, widths):
+        if kind in (_FLOAT, _INT):
+            return "scalars"
+        if kind == _TIME_SERIES:
+            return "series", widths[slot]
+        return "objects"
+
+    def _free_value(self, kind: int, slot: int):
+        """Mark the slot of a replaced value for reuse
+        """
+        if kind == _OBJECT:
+            self._objects[slot] = None
+        self._free_slots.setdefault(self._store(kind, slot, self._series_widths), list()).append(slot)
+
+    def _reuse_slot(self, store):
+        _slots = self._free_slots.get(store)
+        return _slots.pop() if _slots else None
+
+    def _value(self, kind: int, slot: int):
+        if kind == _FLOAT:
+            return self._scalars[slot]
+        if kind == _INT:
+            return int(self._scalars[slot])
+        if kind == _TIME_SERIES:
+            # a copy, the row of the matrix may be reused after the value is replaced
+            _values = self._matrices[self._series_widths[slot]].data[self._series_rows[slot]].copy()
+            _start, _resolution, _repeat, _ignore_year = self._series_indexes.values[self._series_index_codes[slot]]
+            return ArrayTimeSeries(_start, _resolution, _values, _repeat, _ignore_year)
+        return self._objects[slot]
+
+    def _row(self, position: int) -> tuple:
+        _entity = self._entities.values[self._entity_codes[position]]
+        _alternative = self._alternatives.values[self._alternative_codes[position]]
+        _row = (
+            self._classes.values[self._class_codes[position]],
+            _entity,
+            self._parameters.values[self._parameter_codes[position]],
+            self._value(self._kinds[position], self._slots[position]),
+        )
+        if _alternative is None:
+            return _row
+        return _row + (_alternative,)
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ColumnarValues index out of range")
+        return self._row(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __contains__(self, row):
+        try:
+            return self.position(row) is not None or self._is_taken(row)
+        except (IndexError, TypeError):
+            return False
+
+    def append(self, row):
+        _codes = self._key_codes(row)
+        if _codes in self._positions or _codes in self._taken:
+            return None
+        self._append(_codes, row)
+
+    def _append(self, codes: tuple, row):
+        self._positions[codes] = len(self)
+        self._class_codes.append(codes[0])
+        self._entity_codes.append(codes[1])
+        self._parameter_codes.append(codes[2])
+        self._alternative_codes.append(self._alternative_code(row))
+        _kind, _slot = self._store_value(row[3])
+        self._kinds.append(_kind)
+        self._slots.append(_slot)
+        if self.on_added is not None:
+            self.on_added(row)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def __iadd__(self, rows):
+        self.extend(rows)
+        return self
+
+    def upsert(self, row):
+        """Add a row or replace the row with the same key in place, i.e. the last writer wins
+
+        Returns:
+            replaced (bool): True if a row was replaced
+        """
+        _codes = self._key_codes(row)
+        _position = self._positions.get(_codes)
+        if _position is None:
+            # a row with a taken key is added again to override the one taken
+            self._append(_codes, row)
+            return False
+        self._replace(_position, row)
+        return True
+
+    def take(self) -> list:
+        """Remove and return all rows, e.g. to import them into a database
+
+        The keys of the rows are kept, hence rows with the same keys are still ignored on append.
+        """
+        _rows = list(self)
+        _interners = (self._classes, self._entities, self._parameters, self._alternatives, self._series_indexes)
+        _taken = self._taken
+        _taken.update(self._positions)
+        self.__init__()
+        self._classes, self._entities, self._parameters, self._alternatives, self._series_indexes = _interners
+        self._taken = _taken
+        return _rows
+
+    def _alternative_code(self, row) -> int:
+        """Code of the alternative as given in the row, None for a row without one
+        """
+        return self._alternatives.code(row[4] if len(row) > 4 else None)
+
+    def _replace(self, position: int, row):
+        """Replace the row at position with a row of the same key, the storage of the previous value is reused
+        """
+        self._free_value(self._kinds[position], self._slots[position])
+        self._alternative_codes[position] = self._alternative_code(row)
+        self._kinds[position], self._slots[position] = self._store_value(row[3])
+        if self.on_added is not None:
+            self.on_added(row)
+
+    def _rebuild(self, rows):
+        _rows = list(rows)
+        _taken = self._taken
+        self.clear()
+        self.extend(_rows)
+        self._taken = _taken
+
+    def __setitem__(self, index, row):
+        if isinstance(index, int):
+            if index < 0:
+                index += len(self)
+            if self._positions.get(self.key(row)) == index:
+                self._replace(index, row)
+                return None
+        _rows = list(self)
+        _rows[index] = row
+        self._rebuild(_rows)
+
+    def __delitem__(self, index):
+        _rows = list(self)
+        del _rows[index]
+        self._rebuild(_rows)
+
+    def insert(self, index, row):
+        if row in self:
+            return None
+        _rows = list(self)
+        _rows.insert(index, row)
+        self._rebuild(_rows)
+
+    def clear(self):
+        self.__init__()
+
+    def __getstate__(self):
+        # the hook refers to the importer, which is not pickled along
+        _state = self.__dict__.copy()
+        _state.pop("on_added", None)
+        return _state
+
+    def copy(self):
+        return self.__class__(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ColumnarValues)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ColumnarValues({list(self)})"
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the columns and of the time series matrices in bytes, excluding other values
+        """
+        _columns = (
+            self._class_codes, self._entity_codes, self._parameter_codes, self._alternative_codes, self._kinds,
+            self._slots, self._scalars, self._series_widths, self._series_rows, self._series_index_codes,
+        )
+        _n_bytes = sum(x.itemsize * len(x) for x in _columns)
+        return _n_bytes + sum(x.data.nbytes for x in self._matrices.values())
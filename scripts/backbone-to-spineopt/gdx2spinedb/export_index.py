@@ -0,0 +1,218 @@
+"""Module defines an indexed, read-only view on the export dictionary of a Spine database
+"""
+
+# entity types whose rows are looked up by class, entity and parameter value key
+_INDEXED_ENTITY_TYPES = ("objects", "relationships", "object_parameter_values", "relationship_parameter_values")
+
+
+def _entity_tuple(entity) -> tuple:
+    """Entity of an export row as a tuple, i.e. (object_name,) or (object_name_1, object_name_2, ...)
+    """
+    if isinstance(entity, str):
+        return (entity,)
+    return tuple(entity)
+
+
+def _frozen(groups: dict) -> dict:
+    """Groups of rows as tuples, so that the lookups cannot change the index
+    """
+    return {key: tuple(rows) for key, rows in groups.items()}
+
+
+def as_export_index(export_data):
+    """Wrap an export dictionary in an ExportIndex unless it is one already
+
+    A dictionary is wrapped anew on each call, hence converters called one after another should be given
+    the ExportIndex of gdx2spinedb.spinedb.SpinedbIO.export_spinedb(indexed=True) to share its lazily built indexes.
+
+    Args:
+        export_data (dict or ExportIndex): obtained via gdx2spinedb.spinedb.SpinedbIO.export_spinedb()
+
+    Returns:
+        export_index (ExportIndex)
+    """
+    if isinstance(export_data, ExportIndex):
+        return export_data
+    return ExportIndex(export_data)
+
+
+class ExportIndex(object):
+    """Export of a Spine database with constant-time lookups by class, entity prefix and parameter value key
+
+    Rows are kept as exported, e.g. ('unit__to_node', ['unit', 'node'], 'unit_capacity', 100.0, 'Base'),
+    and the instance can be used in place of the export dictionary, e.g. export_index['relationships'].
+    The indexes are built lazily per entity type and class on first use, or all at once by build().
+    Lookups return tuples of rows, the rows themselves are those of the export and must not be changed.
+    Example::
+
+        index = spinedb_io.export_spinedb(indexed=True)
+        index.rows('relationships', 'grid__node__unit__io')
+        index.with_prefix('relationship_parameter_values', 'grid__node__unit__io', 'elec', '75FI')
+        index.value('object_parameter_values', 'unit', '75FI_Nuclear', 'number_of_units', 'Base')
+    """
+
+    def __init__(self, export_data: dict):
+        self._data = export_data
+        self._by_class = dict()
+        self._by_prefix = dict()
+        self._by_member = dict()
+        self._members = dict()
+        self._by_key = dict()
+        # memo for data derived from the export, e.g. restored fuel prices
+        self.cache = dict()
+
+    def __getitem__(self, entity_type: str):
+        return self._data[entity_type]
+
+    def __contains__(self, entity_type):
+        return entity_type in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def keys(self):
+        return self._data.keys()
+
+    def items(self):
+        return self._data.items()
+
+    def get(self, entity_type: str, default=None):
+        return self._data.get(entity_type, default)
+
+    def _classes(self, entity_type: str) -> dict:
+        """Rows of an entity type grouped by class
+        """
+        _classes = self._by_class.get(entity_type)
+        if _classes is None:
+            _classes = dict()
+            for row in self._data.get(entity_type, ()):
+                _classes.setdefault(row[0], list()).append(row)
+            _classes = self._by_class[entity_type] = _frozen(_classes)
+        return _classes
+
+    def rows(self, entity_type: str, class_name: str) -> tuple:
+        """All rows of a class
+
+        Args:
+            entity_type (str): key of the export dictionary, e.g. 'relationships'
+            class_name (str): name of an object or relationship class
+        """
+        return self._classes(entity_type).get(class_name, ())
+
+    def with_prefix(self, entity_type: str, class_name: str, *prefix: str) -> tuple:
+        """Rows of a class whose entity starts with the given object names
+
+        Equivalent to [x for x in export[entity_type] if x[0] == class_name and x[1][:len(prefix)] == list(prefix)]
+        """
+        if not prefix:
+            return self.rows(entity_type, class_name)
+        return self._prefixes(entity_type, class_name).get(tuple(prefix), ())
+
+    def _prefixes(self, entity_type: str, class_name: str) -> dict:
+        """Rows of a class grouped by every prefix of their entity
+        """
+        _prefixes = self._by_prefix.get((entity_type, class_name))
+        if _prefixes is None:
+            _prefixes = dict()
+            for row in self.rows(entity_type, class_name):
+                _entity = _entity_tuple(row[1])
+                for i in range(1, len(_entity) + 1):
+                    _prefixes.setdefault(_entity[:i], list()).append(row)
+            _prefixes = self._by_prefix[(entity_type, class_name)] = _frozen(_prefixes)
+        return _prefixes
+
+    def with_member(self, entity_type: str, class_name: str, name: str) -> tuple:
+        """Rows of a class whose entity contains the given object name at any position
+
+        Equivalent to [x for x in export[entity_type] if x[0] == class_name and name in x[1]] for relationships
+        """
+        return self._member_rows(entity_type, class_name).get(name, ())
+
+    def _member_rows(self, entity_type: str, class_name: str) -> dict:
+        """Rows of a class grouped by the object names of their entity
+        """
+        _members = self._by_member.get((entity_type, class_name))
+        if _members is None:
+            _members = dict()
+            for row in self.rows(entity_type, class_name):
+                for _name in set(_entity_tuple(row[1])):
+                    _members.setdefault(_name, list()).append(row)
+            _members = self._by_member[(entity_type, class_name)] = _frozen(_members)
+        return _members
+
+    def has_member(self, entity_type: str, name: str) -> bool:
+        """Whether any row of an entity type, regardless of the class, contains the given object name
+        """
+        return name in self._member_names(entity_type)
+
+    def _member_names(self, entity_type: str) -> set:
+        """Object names in the entities of an entity type
+        """
+        _members = self._members.get(entity_type)
+        if _members is None:
+            _members = set()
+            for row in self._data.get(entity_type, ()):
+                _members.update(_entity_tuple(row[1]))
+            self._members[entity_type] = _members
+        return _members
+
+    def value(self, entity_type: str, class_name: str, entity, parameter: str, alternative: str = "Base",
+              default=None):
+        """Parameter value of an entity in an alternative
+
+        Args:
+            entity_type (str): 'object_parameter_values' or 'relationship_parameter_values'
+            class_name (str):
+            entity (str or list): object name or object name list of a relationship
+            parameter (str):
+            alternative (str):
+            default: returned if no such value exists
+
+        Returns:
+            the (parsed) parameter value
+        """
+        return self._values(entity_type).get((class_name, _entity_tuple(entity), parameter, alternative), default)
+
+    def _values(self, entity_type: str) -> dict:
+        """Parameter values of an entity type by (class, entity, parameter, alternative), the first row counts
+        """
+        _values = self._by_key.get(entity_type)
+        if _values is None:
+            _values = dict()
+            for row in self._data.get(entity_type, ()):
+                _key = (row[0], _entity_tuple(row[1]), row[2], row[4])
+                _values.setdefault(_key, row[3])
+            self._by_key[entity_type] = _values
+        return _values
+
+    def required_value(self, entity_type: str, class_name: str, entity, parameter: str, alternative: str = "Base"):
+        """Parameter value of an entity in an alternative, see value()
+
+        Raises:
+            KeyError: No such value
+        """
+        _missing = object()
+        _value = self.value(entity_type, class_name, entity, parameter, alternative, default=_missing)
+        if _value is _missing:
+            raise KeyError(f"No {parameter} of {class_name} {entity} in alternative {alternative} in {entity_type}")
+        return _value
+
+    def build(self, entity_types=_INDEXED_ENTITY_TYPES):
+        """Build all indexes of the given entity types at once instead of lazily
+
+        E.g. before worker processes inherit the index, which would otherwise build the same indexes each.
+
+        Args:
+            entity_types (Iterable): keys of the export dictionary
+
+        Returns:
+            export_index (ExportIndex): self
+        """
+        for entity_type in entity_types:
+            self._member_names(entity_type)
+            if entity_type.endswith("parameter_values"):
+                self._values(entity_type)
+            for class_name in self._classes(entity_type):
+                self._prefixes(entity_type, class_name)
+                self._member_rows(entity_type, class_name)
+        return self
@@ -0,0 +1,311 @@
+"""Module defines a caching wrapper for GDX files read with gdx2py
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from gdx2py import gams
+
+# default memory cap of the symbols and pandas forms memoized per GDX file
+DEFAULT_MAX_BYTES = 1024 ** 3
+# rough size of each domain label and of the value of an element of a symbol read by gdx2py, as Python objects
+_ELEMENT_ITEM_NBYTES = 64
+# version of the layout of symbols stored on disk, part of the path to leave out stores of other layouts
+_STORE_LAYOUT = 1
+
+
+def _nbytes(data) -> int:
+    """Approximate size of a memoized pandas object in bytes
+    """
+    try:
+        _n_bytes = data.memory_usage(index=True, deep=False)
+    except AttributeError:
+        return 0
+    # a Series gives the sum, a DataFrame the usage per column
+    return int(getattr(_n_bytes, "sum", lambda: _n_bytes)())
+
+
+def _symbol_nbytes(symbol) -> int:
+    """Approximate size of a symbol in bytes, i.e. of its elements as read by gdx2py, or of the index and the
+    memory-mapped values of a stored parameter
+    """
+    if isinstance(symbol, _StoredParameter):
+        return _nbytes(symbol.to_pandas())
+    try:
+        _n_elements = len(symbol)
+    except TypeError:
+        return 0
+    return _n_elements * _ELEMENT_ITEM_NBYTES * ((getattr(symbol, "dimension", None) or 1) + 1)
+
+
+def _view(data):
+    """A pandas object sharing the data of data but with an index of its own,
+    hence renaming its levels in place, as prepare_gdx_ts2spineopt() does, leaves the memoized object untouched
+    """
+    try:
+        _view = data.copy(deep=False)
+        _view.index = data.index.copy()
+    except AttributeError:
+        return data
+    return _view
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 of the content of a file as a hexadecimal string
+    """
+    _hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for _chunk in iter(lambda: f.read(1 << 20), b""):
+            _hash.update(_chunk)
+    return _hash.hexdigest()
+
+
+class _StoredParameter(object):
+    """GAMS parameter loaded from a SymbolStore, its values and index codes are memory-mapped
+
+    Provides the attributes of gams.GAMSParameter read by the converters without subclassing it,
+    i.e. without depending on the internals of gdx2py, see is_parameter().
+    """
+
+    def __init__(self, series: pd.Series, domain, dimension: int, expl_text: str):
+        self.expl_text = expl_text
+        self.domain = domain
+        self.dimension = dimension
+        self._series = series
+
+    def __len__(self):
+        return len(self._series)
+
+    def keys(self) -> list:
+        return self._series.index.tolist()
+
+    def values(self) -> list:
+        return self._series.tolist()
+
+    def to_pandas(self):
+        return _view(self._series)
+
+
+def is_parameter(symbol) -> bool:
+    """True for a GAMS parameter, as read from a GDX file or loaded from a SymbolStore
+    """
+    return isinstance(symbol, (gams.GAMSParameter, _StoredParameter))
+
+
+class SymbolStore(object):
+    """Columnar on-disk store of the parameters of a GDX file, keyed by the content hash of the file
+
+    A parameter is stored as .npy files, its values and per index level the codes and the labels,
+    next to a meta.json with its domain, dimension and explanatory text. Loading maps the values and codes
+    into memory instead of decoding the GDX file again.
+    Example::
+
+        store = SymbolStore("cache", "input.gdx")
+        if "ts_influx" not in store:
+            store.save("ts_influx", gdx_file["ts_influx"])
+        store.load("ts_influx").to_pandas()
+    """
+
+    def __init__(self, cache_dir: str, gdx_path: str):
+        """
+        Args:
+            cache_dir (str): directory of the stores of all GDX files
+            gdx_path (str): path of the GDX file, its content is hashed
+        """
+        self._dir = os.path.join(cache_dir, f"v{_STORE_LAYOUT}", content_hash(gdx_path))
+
+    def _symbol_dir(self, key: str) -> str:
+        return os.path.join(self._dir, key)
+
+    def __contains__(self, key):
+        return isinstance(key, str) and os.path.isfile(os.path.join(self._symbol_dir(key), "meta.json"))
+
+    def save(self, key: str, symbol):
+        """Store a parameter, written to a temporary directory first so that a failed write leaves no entry
+        """
+        _series = symbol.to_pandas()
+        _index = _series.index
+        if isinstance(_index, pd.MultiIndex):
+            _levels, _codes = list(_index.levels), list(_index.codes)
+        else:
+            _codes, _uniques = pd.factorize(_index)
+            _levels, _codes = [_uniques], [_codes]
+        os.makedirs(self._dir, exist_ok=True)
+        _temp_dir = tempfile.mkdtemp(dir=self._dir)
+        try:
+            np.save(os.path.join(_temp_dir, "values.npy"), np.asarray(_series.values, dtype=np.float64))
+            for i, (_level, _code) in enumerate(zip(_levels, _codes)):
+                np.save(os.path.join(_temp_dir, f"codes_{i}.npy"), np.asarray(_code, dtype=np.int32))
+                np.save(os.path.join(_temp_dir, f"labels_{i}.npy"), np.asarray(_level, dtype=str))
+            _meta = {
+                "domain": None if symbol.domain is None else list(symbol.domain),
+                "dimension": symbol.dimension,
+                "expl_text": symbol.expl_text,
+                "names": list(_index.names),
+                "name": _series.name,
+            }
+            with open(os.path.join(_temp_dir, "meta.json"), "w") as f:
+                json.dump(_meta, f)
+            os.replace(_temp_dir, self._symbol_dir(key))
+        except OSError:
+            # e.g. stored by another process meanwhile
+            shutil.rmtree(_temp_dir, ignore_errors=True)
+
+    def load(self, key: str) -> _StoredParameter:
+        """Stored parameter with memory-mapped values and index codes
+        """
+        _symbol_dir = self._symbol_dir(key)
+        with open(os.path.join(_symbol_dir, "meta.json")) as f:
+            _meta = json.load(f)
+        _values = np.load(os.path.join(_symbol_dir, "values.npy"), mmap_mode="r")
+        _n_levels = len(_meta["names"])
+        _codes = [np.load(os.path.join(_symbol_dir, f"codes_{i}.npy"), mmap_mode="r") for i in range(_n_levels)]
+        _labels = [np.load(os.path.join(_symbol_dir, f"labels_{i}.npy")).astype(object) for i in range(_n_levels)]
+        if _n_levels == 1:
+            _index = pd.Index(_labels[0].take(_codes[0]), name=_meta["names"][0])
+        else:
+            _index = pd.MultiIndex(levels=_labels, codes=_codes, names=_meta["names"], verify_integrity=False)
+        _series = pd.Series(_values, index=_index, name=_meta["name"], copy=False)
+        return _StoredParameter(_series, _meta["domain"], _meta["dimension"], _meta["expl_text"])
+
+
+class GdxSymbolCache(object):
+    """GDX file wrapper that reads each symbol once and memoizes its pandas form
+
+    Symbols are kept in least-recently-used order and the least recently used ones are evicted
+    when the symbols and their pandas forms take more memory than max_bytes. Other attributes, e.g. keys() or close(),
+    are those of the wrapped file.
+    Example::
+
+        gdx = GdxSymbolCache(gdx2py.GdxFile("input.gdx"))
+        gdx["ts_influx"].dimension
+        gdx.to_pandas("ts_influx")  # read once, later calls return views on the same data
+
+    With a cache_dir, parameters are also kept in a SymbolStore, i.e. later runs on a GDX file of the same content
+    map them from disk instead of decoding the file.
+    """
+
+    def __init__(self, gdx_file, max_bytes=DEFAULT_MAX_BYTES, cache_dir=None):
+        """
+        Args:
+            gdx_file (gdx2py.GdxFile): an open GDX file
+            max_bytes (int, optional): memory cap of the memoized symbols and pandas forms in bytes, None for no cap
+            cache_dir (str, optional): directory of the on-disk store of parameters, None for no store
+        """
+        self._gdx_file = gdx_file
+        self._max_bytes = max_bytes
+        self._cache_dir = cache_dir
+        self._store = None
+        self._symbols = OrderedDict()
+        self._frames = dict()
+        self._sizes = dict()
+
+    def __getattr__(self, name):
+        if name == "_gdx_file":
+            raise AttributeError(name)
+        return getattr(self._gdx_file, name)
+
+    def __len__(self):
+        return len(self._gdx_file)
+
+    def __iter__(self):
+        return iter(self._gdx_file)
+
+    def __contains__(self, key):
+        return key in self._gdx_file
+
+    def __getitem__(self, key):
+        """The symbol, read from the file on first access
+
+        Raises:
+            KeyError: No such symbol
+        """
+        _symbol = self._symbols.get(key)
+        if _symbol is None:
+            _symbol = self._symbols[key] = self._read(key)
+            self._sizes[key] = _symbol_nbytes(_symbol)
+            # the new symbol is the most recently used one and kept
+            self._evict()
+        self._symbols.move_to_end(key)
+        return _symbol
+
+    @property
+    def store(self):
+        """The on-disk store of the file's parameters, None without a cache_dir
+        """
+        if self._store is None and self._cache_dir is not None:
+            self._store = SymbolStore(self._cache_dir, self._gdx_file.filename)
+        return self._store
+
+    def _read(self, key):
+        """Read a symbol from the on-disk store if there, from the file otherwise and store it if a parameter
+        """
+        _store = self.store
+        if _store is None or not isinstance(key, str):
+            return self._gdx_file[key]
+        if key not in _store:
+            _symbol = self._gdx_file[key]
+            if not is_parameter(_symbol):
+                return _symbol
+            _store.save(key, _symbol)
+            if key not in _store:
+                return _symbol
+        return _store.load(key)
+
+    def to_pandas(self, key):
+        """pandas form of a symbol, memoized and returned as a view
+
+        Raises:
+            KeyError: No such symbol
+        """
+        _symbol = self[key]
+        if key not in self._frames:
+            self._frames[key] = _symbol.to_pandas()
+            if not isinstance(_symbol, _StoredParameter):
+                # the pandas form of a stored parameter shares the data counted for the symbol
+                self._sizes[key] = self._sizes.get(key, 0) + _nbytes(self._frames[key])
+            self._evict()
+        return _view(self._frames[key])
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the memoized symbols and pandas forms in bytes
+        """
+        return sum(self._sizes.values())
+
+    def _evict(self):
+        """Drop the least recently used symbols and their pandas forms until they fit in the memory cap,
+        the most recently used symbol is kept in any case
+        """
+        if self._max_bytes is None:
+            return None
+        while self.nbytes > self._max_bytes and len(self._symbols) > 1:
+            self.evict(next(iter(self._symbols)))
+
+    def evict(self, key):
+        """Drop a symbol and its pandas form, it is read from the file again on next access
+        """
+        self._symbols.pop(key, None)
+        self._frames.pop(key, None)
+        self._sizes.pop(key, None)
+
+    def clear(self):
+        self._symbols.clear()
+        self._frames.clear()
+        self._sizes.clear()
+
+    def close(self):
+        self.clear()
+        self._gdx_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,379 @@
+"""Module reads Backbone GDX symbols straight into the export format of a Spine database
+
+The symbols are converted in memory as the Spine Toolbox Importer would with the GDX mappings in scripts/mappings,
+e.g. gdx2spinedb_v1.3.json, hence the bb2spineopt converters can be fed without an intermediate Backbone Spine DB.
+Mappings are executed on whole columns of the symbol tables, e.g. a map value per series of ts_influx
+is gathered from its rows in one pass, and the result can be written to a Spine database with import_gdx().
+Run as a module, e.g. python -m gdx2spinedb.gdx_export input.gdx sqlite:///backbone.sqlite,
+to refresh a Backbone Spine DB without Spine Toolbox, see io_config.get_argument() for the options.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from spinedb_api.parameter_value import Map
+from gdx2py import gams
+from gdx2spinedb.export_index import ExportIndex
+from gdx2spinedb.keyed_list import (
+    KeyedList, leading_pair_key, name_key, object_key, parameter_value_key, relationship_key
+)
+
+# Importer specifications of the Backbone GDX files in the repository
+MAPPINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "mappings")
+DEFAULT_MAPPINGS = (
+    os.path.join(MAPPINGS_DIR, "gdx2spinedb_v1.3.json"),
+    os.path.join(MAPPINGS_DIR, "gdx2spinedb_ts-cf_influx.json"),
+)
+# entity types of the export and the natural keys of their rows
+_EXPORT_KEYS = {
+    "object_classes": name_key,
+    "relationship_classes": name_key,
+    "object_parameters": leading_pair_key,
+    "relationship_parameters": leading_pair_key,
+    "objects": object_key,
+    "relationships": relationship_key,
+    "object_parameter_values": parameter_value_key,
+    "relationship_parameter_values": parameter_value_key,
+    "alternatives": name_key,
+}
+# columns of an unpivoted table holding the header labels and the cell values of the pivoted columns
+_HEADER, _CELL = "header", "cell"
+
+
+class TableMapping(object):
+    """Mapping of the rows of one table to entities and parameter values of a class
+
+    Items of a row are given by a column of the table, i.e. for a GDX symbol its domain labels followed by its value,
+    by a constant or, for a pivoted table, by the header, i.e. the column labels of the table.
+    In a pivoted table the columns not mapped and not in skip_columns hold the values, one per header label.
+    """
+
+    def __init__(self):
+        self.class_name = None
+        self.object_classes = list()
+        self.entities = list()
+        self.import_objects = False
+        self.parameter = None
+        self.alternative = None
+        self.value = None
+        self.value_type = None
+        self.index = None
+        self.skip_columns = list()
+
+    @property
+    def is_relationship(self) -> bool:
+        return bool(self.object_classes)
+
+    def _items(self) -> list:
+        return self.entities + [self.parameter, self.alternative, self.value, self.index]
+
+    @property
+    def is_pivoted(self) -> bool:
+        return any(x is not None and x[0] == "header" for x in self._items())
+
+    @classmethod
+    def from_components(cls, components: list):
+        """Mapping from the list of components of an Importer specification, e.g. of gdx2spinedb_v1.3.json
+        """
+        _mapping = cls()
+        for component in components:
+            _type = component["map_type"]
+            _item = _component_item(component)
+            if _type in ("ObjectClass", "RelationshipClass"):
+                _mapping.class_name = component.get("value")
+                _mapping.skip_columns = component.get("skip_columns") or list()
+            elif _type == "RelationshipClassObjectClass":
+                _mapping.object_classes.append(component.get("value"))
+            elif _type in ("Object", "RelationshipObject"):
+                _mapping.entities.append(_item)
+                _mapping.import_objects |= component.get("import_objects", False)
+            elif _type == "ParameterDefinition":
+                _mapping.parameter = _item
+            elif _type == "Alternative":
+                _mapping.alternative = _item
+            elif _type in ("ParameterValue", "ExpandedValue"):
+                _mapping.value = _item
+            elif _type == "ParameterValueType":
+                _mapping.value_type = component.get("value")
+            elif _type == "ParameterValueIndex":
+                _mapping.index = _item
+        return _mapping
+
+    @classmethod
+    def from_legacy(cls, specification: dict):
+        """Mapping from a specification of the older Importer format, e.g. of gdx2spinedb_ts-cf_influx.json
+        """
+        _mapping = cls()
+        _mapping.class_name = _legacy_item(specification.get("name"))
+        _mapping.class_name = None if _mapping.class_name is None else _mapping.class_name[1]
+        _mapping.import_objects = specification.get("import_objects", False)
+        _mapping.skip_columns = specification.get("skip_columns") or list()
+        _objects = specification.get("objects") or list()
+        _mapping.entities = [_legacy_item(x) for x in (_objects if isinstance(_objects, list) else [_objects])]
+        _mapping.entities = [x for x in _mapping.entities if x is not None]
+        if specification["map_type"] == "RelationshipClass":
+            _mapping.object_classes = [_legacy_item(x)[1] for x in specification.get("object_classes", list())]
+        _parameters = specification.get("parameters") or dict()
+        if _parameters.get("map_type") == "ParameterValue":
+            _mapping.parameter = _legacy_item(_parameters.get("name"))
+            _mapping.alternative = _legacy_item(_parameters.get("alternative_name"))
+            _value = _parameters.get("value") or dict()
+            _mapping.value = _legacy_item(_value.get("main_value"))
+            _mapping.value_type = _value.get("value_type")
+            _extra_dimensions = _value.get("extra_dimensions") or list()
+            if _extra_dimensions:
+                _mapping.index = _legacy_item(_extra_dimensions[0])
+        return _mapping
+
+    def entity_classes(self) -> list:
+        """Names of the classes the mapping writes to, including those of objects imported with relationships
+        """
+        if self.import_objects:
+            return [self.class_name] + self.object_classes
+        return [self.class_name]
+
+    def unpivot(self, table: pd.DataFrame):
+        """Pivoted table in long form and the mapping of it, see pandas.DataFrame.melt()
+
+        The long table has the mapped columns of table, the header labels in column 'header'
+        and the values in column 'cell'. Items mapped to the header are mapped to column 'header',
+        the parameter value, or the value of a map, to column 'cell'.
+
+        Returns:
+            table (pandas.DataFrame), mapping (TableMapping)
+        """
+        _id_columns = list(dict.fromkeys(x[1] for x in self._items() if x is not None and x[0] == "column"))
+        _value_columns = [x for x in table.columns if x not in _id_columns and x not in self.skip_columns]
+        _table = table.melt(id_vars=_id_columns, value_vars=_value_columns, var_name=_HEADER, value_name=_CELL)
+        _mapping = TableMapping()
+        _mapping.__dict__.update(self.__dict__)
+
+        def _long(item):
+            return ("column", _HEADER) if item is not None and item[0] == "header" else item
+
+        _mapping.entities = [_long(x) for x in self.entities]
+        _mapping.parameter, _mapping.alternative, _mapping.index = map(
+            _long, (self.parameter, self.alternative, self.index)
+        )
+        _mapping.value = ("column", _CELL)
+        return _table, _mapping
+
+
+def _component_item(component: dict):
+    """('column', position), ('header', row) or ('constant', value) of a component of an Importer specification,
+    None if unmapped. Negative positions refer to header rows, -1 to the first one.
+    """
+    _position = component.get("position")
+    if isinstance(_position, int):
+        return ("column", _position) if _position >= 0 else ("header", -_position - 1)
+    if component.get("value") is not None:
+        return "constant", component["value"]
+    return None
+
+
+def _legacy_item(item):
+    if not item or item.get("map_type") in (None, "None"):
+        return None
+    if item["map_type"] == "column":
+        return "column", item["reference"]
+    if item["map_type"] == "row":
+        return "header", item["reference"]
+    return "constant", item["reference"]
+
+
+def _column(table: pd.DataFrame, item, default=None) -> pd.Series:
+    """Values of an item for all rows of a table
+    """
+    if item is None or item[0] == "constant":
+        return pd.Series(default if item is None else item[1], index=table.index, dtype=object)
+    return table[item[1]]
+
+
+def load_mappings(path: str) -> dict:
+    """Table mappings of the selected tables of an Importer specification file
+
+    Returns:
+        mappings (dict): a list of TableMapping per table, i.e. per GDX symbol
+    """
+    with open(path) as f:
+        _specification = json.load(f)["mapping"]
+    _mappings = dict()
+    for table in _specification.get("selected_tables", _specification["table_mappings"]):
+        for _table_mapping in _specification["table_mappings"].get(table, list()):
+            if "map_type" in _table_mapping:
+                _mapping = TableMapping.from_legacy(_table_mapping)
+            else:
+                # {"Mapping 0": {"mapping": [...]}}
+                _mapping = [TableMapping.from_components(x["mapping"]) for x in _table_mapping.values()][0]
+            if _mapping.class_name is not None:
+                _mappings.setdefault(table, list()).append(_mapping)
+    return _mappings
+
+
+def symbol_table(gdx_file, symbol: str) -> pd.DataFrame:
+    """Table of a GDX symbol as read by the Importer, i.e. columns 0, 1, ... of the domain labels of each record
+    followed by a column of its value for a parameter
+
+    Args:
+        gdx_file (gdx2py.GdxFile or gdx2spinedb.gdx_cache.GdxSymbolCache): an open GDX file
+        symbol (str): name of a set or parameter
+    """
+    _symbol = gdx_file[symbol]
+    if isinstance(_symbol, gams.GAMSSet):
+        return pd.DataFrame([x if isinstance(x, tuple) else (x,) for x in _symbol.elements])
+    if hasattr(gdx_file, "to_pandas"):
+        _series = gdx_file.to_pandas(symbol)
+    else:
+        _series = _symbol.to_pandas()
+    _table = _series.reset_index()
+    _table.columns = range(_table.shape[1])
+    return _table
+
+
+def _group_positions(frame: pd.DataFrame, keys: list):
+    """Positions of the rows of each group of equal keys, groups in order of appearance
+
+    Returns:
+        firsts (numpy.ndarray), positions (list): position of the first row and positions of all rows per group
+    """
+    _codes = frame.groupby(keys, sort=False).ngroup().to_numpy()
+    _order = np.argsort(_codes, kind="stable")
+    _positions = np.split(_order, np.flatnonzero(np.diff(_codes[_order])) + 1)
+    return np.array([x[0] for x in _positions], dtype=int), _positions
+
+
+def _convert(table: pd.DataFrame, mapping: TableMapping, export: dict):
+    """Add the entities and parameter values of the rows of table to export
+    """
+    if mapping.is_pivoted:
+        table, mapping = mapping.unpivot(table)
+    _entity_type = "relationship" if mapping.is_relationship else "object"
+    if mapping.is_relationship:
+        export["relationship_classes"].append((mapping.class_name, mapping.object_classes, None, None))
+    else:
+        export["object_classes"].append((mapping.class_name, None, None))
+    if table.empty:
+        return None
+    _n_entities = len(mapping.entities)
+    _frame = pd.DataFrame({i: _column(table, x).to_numpy() for i, x in enumerate(mapping.entities)})
+    _entities = _frame.drop_duplicates().itertuples(index=False, name=None)
+    if mapping.is_relationship:
+        export["relationships"].extend((mapping.class_name, list(x)) for x in _entities)
+        if mapping.import_objects:
+            for i, object_class in enumerate(mapping.object_classes):
+                export["objects"].extend((object_class, x, None) for x in _frame[i].unique())
+    else:
+        export["objects"].extend((mapping.class_name, x[0], None) for x in _entities)
+    if mapping.parameter is None or mapping.value is None:
+        return None
+    _frame["parameter"] = _column(table, mapping.parameter).to_numpy()
+    _frame["alternative"] = _column(table, mapping.alternative, "Base").fillna("Base").to_numpy()
+    export[f"{_entity_type}_parameters"].extend(
+        (mapping.class_name, x, None, None, None) for x in _frame["parameter"].unique()
+    )
+    export["alternatives"].extend((x, None) for x in _frame["alternative"].unique())
+    _keys = list(range(_n_entities)) + ["parameter", "alternative"]
+    _values = _column(table, mapping.value)
+    if mapping.value_type == "map":
+        # a map per entity, parameter and alternative from all of its rows
+        _indexes = _column(table, mapping.index).to_numpy(dtype=object)
+        _cells = _values.to_numpy(dtype=float)
+        _firsts, _positions = _group_positions(_frame, _keys)
+        _rows = _frame.iloc[_firsts].itertuples(index=False, name=None)
+        _values = (Map(_indexes[x].tolist(), _cells[x].tolist()) for x in _positions)
+    else:
+        _firsts = ~_frame.duplicated(_keys).to_numpy()
+        _rows = _frame[_firsts].itertuples(index=False, name=None)
+        _values = _values[_firsts].tolist()
+    for row, value in zip(_rows, _values):
+        _entity = list(row[:_n_entities]) if mapping.is_relationship else row[0]
+        export[f"{_entity_type}_parameter_values"].append(
+            (mapping.class_name, _entity, row[_n_entities], value, row[_n_entities + 1])
+        )
+
+
+def export_tables(read_table, *mapping_paths, indexed=False, classes=None):
+    """Export of the entities and parameter values the mappings make of tables
+
+    Args:
+        read_table (Callable): function returning the table of a name as a pandas.DataFrame, None if there is none
+        mapping_paths (str): Importer specification files, an earlier one wins for rows mapped by several
+        indexed (bool): True to return an ExportIndex
+        classes (list, optional): names of object and relationship classes, None for all
+
+    Returns:
+        data (dict or ExportIndex): Dictionary mapping entity types to lists of exported rows
+    """
+    _classes = None if classes is None else set(classes)
+    _export = {entity_type: KeyedList(key) for entity_type, key in _EXPORT_KEYS.items()}
+    for path in mapping_paths:
+        for table_name, mappings in load_mappings(path).items():
+            if _classes is not None:
+                mappings = [x for x in mappings if _classes.intersection(x.entity_classes())]
+            if not mappings:
+                continue
+            _table = read_table(table_name)
+            if _table is None:
+                continue
+            for mapping in mappings:
+                _convert(_table, mapping, _export)
+    # objects imported along relationships may be of other classes than those asked for
+    _export = {
+        entity_type: [x for x in rows if _classes is None or entity_type == "alternatives" or x[0] in _classes]
+        for entity_type, rows in _export.items()
+    }
+    if indexed:
+        return ExportIndex(_export)
+    return _export
+
+
+def export_gdx(gdx_file, *mapping_paths, indexed=False, classes=None):
+    """Export of the Backbone data in a GDX file as export_spinedb() of a Spine database imported with the mappings
+
+    Symbols whose mappings write none of the classes are not read.
+    Example::
+
+        export_gdx(io_config.open_gdx("input.gdx"), "mappings/gdx2spinedb_v1.3.json", indexed=True, classes=['unit'])
+
+    Args:
+        gdx_file (gdx2py.GdxFile or gdx2spinedb.gdx_cache.GdxSymbolCache): an open GDX file
+        mapping_paths (str): Importer specification files, DEFAULT_MAPPINGS if none
+        indexed (bool): True to return an ExportIndex
+        classes (list, optional): names of object and relationship classes, None for all
+
+    Returns:
+        data (dict or ExportIndex): Dictionary mapping entity types to lists of exported rows
+    """
+    def _read_table(symbol):
+        return symbol_table(gdx_file, symbol) if symbol in gdx_file else None
+
+    return export_tables(_read_table, *(mapping_paths or DEFAULT_MAPPINGS), indexed=indexed, classes=classes)
+
+
+def import_gdx(gdx_file, spinedb_io, *mapping_paths, classes=None, message="Imported Backbone GDX file") -> int:
+    """Import the Backbone data in a GDX file into a Spine database in one transaction
+
+    Args:
+        gdx_file (gdx2py.GdxFile or gdx2spinedb.gdx_cache.GdxSymbolCache): an open GDX file
+        spinedb_io (SpinedbIO): the target database
+        mapping_paths (str): Importer specification files, DEFAULT_MAPPINGS if none
+        classes (list, optional): names of object and relationship classes, None for all
+        message (str): commit message
+
+    Returns:
+        n_buffered (int): Number of rows written
+    """
+    _data = export_gdx(gdx_file, *mapping_paths, classes=classes)
+    with spinedb_io.bulk_session(message):
+        return spinedb_io.import_data(_data)
+
+
+if __name__ == '__main__':
+    from gdx2spinedb import io_config
+
+    gdx, output_db = io_config.open_gdx2spine_io(io_config.get_argument(input_format="GDX"))
+    # a staged database is published on success and discarded on error
+    with output_db:
+        import_gdx(gdx, output_db)
@@ -6,43 +6,93 @@
 
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from gdx2py import gams
 from gdx2spinedb import io_config
+from gdx2spinedb.time_series import ArrayTimeSeries, VariableTimeSeries, time_series_value
+from gdx2spinedb.columnar import ColumnarValues
+from gdx2spinedb.gdx_cache import GdxSymbolCache, is_parameter
+from gdx2spinedb.time_index import time_index
+from gdx2spinedb.keyed_list import (
+    KeyedList, leading_pair_key, name_key, object_key, parameter_value_key, relationship_key, row_key
+)
 
 
 def generate_time_index(year, relative_pos=(0, 0), full_year=False, leap=False, frequency='H'):
     """
+    memoized, see gdx2spinedb.time_index.time_index(), which also provides the time stamps as strings
     :param year:
     :param relative_pos: a tuple (int, int) of start time (hour) and end time (hour, inclusive)
     :param full_year:
     :param leap: True if a leap year is considered, False otherwise
     :param frequency:
-    :return: a pandas DatetimeIndex
+    :return: a pandas DatetimeIndex, shared by the callers with the same arguments
     """
-    if full_year:
-        start = pd.Timestamp(year=year, month=1, day=1, hour=0)
-        end = pd.Timestamp(year=year, month=12, day=31, hour=23)
-        full_year_range = pd.date_range(start, end, freq=frequency)
-        if all([year % 4 == 0, leap]):
-            time_steps = 8784
-            return full_year_range[:time_steps]
-        else:
-            # skip the leap day
-            time_steps = 8760
-            full_year_range = full_year_range[~((full_year_range.month == 2) & (full_year_range.day == 29))]
-            return full_year_range[:time_steps]
-    start = pd.Timestamp(year=year, month=1, day=1, hour=0) + pd.to_timedelta(relative_pos[0], unit=frequency)
-    # Skip the leap day
-    if not leap and start >= pd.Timestamp(year=year, month=2, day=29):
-        start = start + pd.Timedelta(1, unit='d')
-    end = start + pd.to_timedelta(relative_pos[1], unit=frequency)
-    time_range = pd.date_range(start, end, freq=frequency)
-    return time_range
+    return time_index(year, relative_pos, full_year, leap, frequency).index
+
+
+# natural keys of the importer collections, a collection keeps one row per key
+_COLLECTION_KEYS = {
+    "objects": object_key,
+    "object_parameter_values": parameter_value_key,
+    "object_groups": row_key,
+    "relationships": relationship_key,
+    "relationship_parameter_values": parameter_value_key,
+    "alternatives": name_key,
+    "scenarios": name_key,
+    "scenario_alternatives": leading_pair_key,
+    "tool_feature_methods": row_key,
+}
+_VALUE_COLLECTIONS = ("object_parameter_values", "relationship_parameter_values")
+# order in which the collections are imported into a database
+_IMPORT_ORDER = (
+    "alternatives",
+    "objects",
+    "object_parameter_values",
+    "object_groups",
+    "relationships",
+    "relationship_parameter_values",
+    "scenarios",
+    "scenario_alternatives",
+    "tool_feature_methods",
+)
+# rough size of a row apart from the arrays of its values, for the memory budget of bound importers
+_ROW_NBYTES = 200
+
+
+def _value_nbytes(value) -> int:
+    """Approximate size of the data of a parameter value in bytes
+    """
+    if isinstance(value, ArrayTimeSeries):
+        return value.values.nbytes
+    if isinstance(value, VariableTimeSeries):
+        return value.values.nbytes + value.indexes.values.nbytes
+    if isinstance(value, dict) and isinstance(value.get("data"), dict):
+        return _ROW_NBYTES * len(value["data"])
+    return 0
 
 
 class SpineDBImporter:
-    def __init__(self):
+    def __init__(self, columnar=False, target=None, max_rows=None, max_bytes=None):
+        """
+        :param columnar: True to store parameter values column-wise (see gdx2spinedb.columnar.ColumnarValues),
+                         which takes a fraction of the memory of value tuples for large importers
+        :param target: a Spine database instance of class gdx2spinedb.spinedb.SpinedbIO to bind the importer to,
+                       the collected rows are then flushed into it as soon as a row added to any collection
+                       exceeds max_rows or max_bytes, hence rows must be added after the entities they refer to
+                       (changes over all rows, e.g. control_alternative() of the builders, miss flushed rows,
+                       nor is a bound importer meant for use inside SpinedbIO.bulk_session())
+        :param max_rows: budget of rows collected before a flush into target
+        :param max_bytes: approximate budget of memory in bytes collected before a flush into target
+        """
+        self._columnar = columnar
+        self._target = target
+        self._max_rows = max_rows
+        self._max_bytes = max_bytes
+        self._pending_bytes = 0
+        self._n_flushed = dict()
         self.objects = list()
         self.object_parameter_values = list()
         self.object_groups = list()
@@ -53,41 +103,163 @@ class SpineDBImporter:
         self.scenario_alternatives = list()
         self.tool_feature_methods = list()
 
+    def __setattr__(self, name, value):
+        # the collections are KeyedLists, or ColumnarValues for values of a columnar importer,
+        # also when plain lists are assigned to them
+        _key = _COLLECTION_KEYS.get(name)
+        if _key is not None:
+            if self._columnar and name in _VALUE_COLLECTIONS:
+                if not isinstance(value, ColumnarValues):
+                    value = ColumnarValues(value)
+            elif not isinstance(value, (KeyedList, ColumnarValues)):
+                value = KeyedList(_key, value)
+            if self._target is not None:
+                # also rows appended to the collections directly count against the budget
+                value.on_added = self._row_added
+        super().__setattr__(name, value)
+
     def __add__(self, other):
-        temp = SpineDBImporter()
-        for k, v in self.__dict__.items():
-            v += other.__getattribute__(k)
-            temp.__setattr__(k, v)
-        return temp
+        """
+        :param other: an instance of class SpineDBImporter
+        :return: a new SpineDBImporter, neither of the operands is modified
+        """
+        return self.merge(self, other, columnar=self._columnar)
 
-    def import_data(self, _output_db):
+    def __iadd__(self, other):
+        """
+        :param other: an instance of class SpineDBImporter, appended to this importer in place
+        :return: this importer
+        """
+        for name in _COLLECTION_KEYS:
+            getattr(self, name).extend(getattr(other, name))
+        return self
+
+    def update(self, other):
+        """
+        append the rows of another importer in place, its parameter values replace those of the same key
+        (last writer wins) as if the importers were imported one after the other, e.g. to batch builder outputs
+        :param other: an instance of class SpineDBImporter
+        :return: this importer
+        """
+        for name in _COLLECTION_KEYS:
+            if name in _VALUE_COLLECTIONS:
+                self.upsert(name, *getattr(other, name))
+            else:
+                getattr(self, name).extend(getattr(other, name))
+        return self
+
+    def n_rows(self) -> int:
+        """
+        :return: number of rows in all collections
+        """
+        return sum(len(getattr(self, name)) for name in _COLLECTION_KEYS)
+
+    def approximate_nbytes(self) -> int:
+        """
+        :return: approximate memory taken by the rows in bytes
+        """
+        _n_bytes = _ROW_NBYTES * self.n_rows()
+        for name in _VALUE_COLLECTIONS:
+            _values = getattr(self, name)
+            if isinstance(_values, ColumnarValues):
+                _n_bytes += _values.nbytes - _ROW_NBYTES * len(_values)
+            else:
+                _n_bytes += sum(_value_nbytes(row[3]) for row in _values)
+        return _n_bytes
+
+    def _row_added(self, row):
+        """
+        account a row added to a collection of a bound importer and flush when the budget is exceeded
+        :param row: the added row
+        """
+        _value = row[3] if isinstance(row, (tuple, list)) and len(row) > 3 else None
+        self._pending_bytes += _ROW_NBYTES + _value_nbytes(_value)
+        if self._over_budget():
+            self.flush()
+
+    def _over_budget(self) -> bool:
+        return any([
+            self._max_rows is not None and self.n_rows() > self._max_rows,
+            self._max_bytes is not None and self._pending_bytes > self._max_bytes,
+        ])
+
+    def flush(self, message="Flushed importer"):
+        """
+        import the rows collected so far into the target database in dependency order and commit,
+        the rows are dropped afterwards but their keys are kept, so that rows added later are still deduplicated
+        :param message: commit message
+        :return: a dictionary of the number of imported rows per collection
+        """
+        if self._target is None:
+            raise RuntimeError("The importer is not bound to a target database")
+        _rows = {name: getattr(self, name).take() for name in _IMPORT_ORDER}
+        _n_imported = self._import_collections(self._target, _rows)
+        self._target.commit(message)
+        self._pending_bytes = 0
+        for name, n in _n_imported.items():
+            self._n_flushed[name] = self._n_flushed.get(name, 0) + n
+        return _n_imported
+
+    def upsert(self, collection: str, *rows):
+        """
+        add rows to a collection, a row replaces the row with the same key in place (last writer wins),
+        e.g. a parameter value replaces the value of the same (class, entity, parameter, alternative)
+        :param collection: name of the collection, e.g. "relationship_parameter_values"
+        :param rows: rows of the collection
+        :return: number of replaced rows
+        """
+        _collection = getattr(self, collection)
+        return sum(_collection.upsert(row) for row in rows)
+
+    @classmethod
+    def merge(cls, *importers, columnar=False):
+        """
+        merge importers into a new one in time linear to the total number of rows,
+        rows are deduplicated by key with the first importer winning, the given importers are not modified
+        :param importers: instances of class SpineDBImporter
+        :param columnar: True for a columnar importer
+        :return: a new SpineDBImporter
+        """
+        merged = cls(columnar=columnar)
+        for importer in importers:
+            merged += importer
+        return merged
+
+    @staticmethod
+    def _import_collections(_output_db, collections: dict) -> dict:
         """
         :param _output_db: a Spine database instance of class gdx2spinedb.spinedb.SpinedbIO
-        :return: None
+        :param collections: a dictionary of rows per collection name
+        :return: a dictionary of the number of imported rows per collection
         """
         # alternatives must be imported as prerequisite to enable importing parameter values with alternatives
-        _n_alternatives = _output_db.import_alternatives(self.alternatives)
-        _n_objects = _output_db.import_objects(self.objects)
-        _n_object_values = _output_db.import_object_parameter_values(self.object_parameter_values)
-        _n_member_objects = _output_db.import_object_groups(self.object_groups)
-        _n_relationships = _output_db.import_relationships(self.relationships)
-        _n_parameter_values = _output_db.import_relationship_parameter_values(self.relationship_parameter_values)
-        _n_scenarios = _output_db.import_scenarios(self.scenarios)
-        _n_scenario_alternatives = _output_db.import_scenario_alternatives(self.scenario_alternatives)
-        _n_tool_feature_methods = _output_db.import_tool_feature_methods(self.tool_feature_methods)
-
-        # Commit changes
-        _output_db.commit("Converted Backbone model")
-
-        print(f" {_n_alternatives} alternatives in addition to the 'Base' are added")
-        print(f" {_n_objects} objects")
-        print(f" {_n_object_values} object_parameter_values")
-        print(f" {_n_member_objects} objects added as the member of some groups")
-        print(f" {_n_relationships} relationships")
-        print(f" {_n_parameter_values} relationship_parameter_values")
-        print(f" {_n_scenarios} scenarios")
-        print(f" {_n_scenario_alternatives} combinations of scenario_alternatives")
-        print(f" {_n_tool_feature_methods} tool_feature_methods defined")
+        return {
+            name: getattr(_output_db, f"import_{name}")(collections[name]) for name in _IMPORT_ORDER
+        }
+
+    def import_data(self, _output_db):
+        """
+        :param _output_db: a Spine database instance of class gdx2spinedb.spinedb.SpinedbIO,
+                           for a bound importer the remaining rows are flushed if it is the target
+        :return: None
+        """
+        if self._target is not None and _output_db is self._target:
+            self.flush("Converted Backbone model")
+            _n_imported = self._n_flushed
+        else:
+            _n_imported = self._import_collections(_output_db, {name: getattr(self, name) for name in _IMPORT_ORDER})
+            # Commit changes
+            _output_db.commit("Converted Backbone model")
+
+        print(f" {_n_imported.get('alternatives', 0)} alternatives in addition to the 'Base' are added")
+        print(f" {_n_imported.get('objects', 0)} objects")
+        print(f" {_n_imported.get('object_parameter_values', 0)} object_parameter_values")
+        print(f" {_n_imported.get('object_groups', 0)} objects added as the member of some groups")
+        print(f" {_n_imported.get('relationships', 0)} relationships")
+        print(f" {_n_imported.get('relationship_parameter_values', 0)} relationship_parameter_values")
+        print(f" {_n_imported.get('scenarios', 0)} scenarios")
+        print(f" {_n_imported.get('scenario_alternatives', 0)} combinations of scenario_alternatives")
+        print(f" {_n_imported.get('tool_feature_methods', 0)} tool_feature_methods defined")
         print("Done.")
         return None
 
@@ -129,24 +301,54 @@ def valid_key(_gdx_file, _key):
 
 def get_gdx_entry(_gdx_file, _key):
     """
-    :param _gdx_file: a *.gdx file instance of class gdx2py.gdxfile.GdxFile
+    :param _gdx_file: a *.gdx file instance of class gdx2py.gdxfile.GdxFile,
+                      or of class gdx2spinedb.gdx_cache.GdxSymbolCache as returned by io_config.open_gdx()
     :param _key: a string of symbol name
     :return: a list of elements if the _key refers to a gdx Set
              a dataframe with parameter values if the _key refers to a gdx Parameter
     """
     valid_key(_gdx_file, _key)
-    if isinstance(_gdx_file[_key], gams.GAMSSet):  # a Set contains only elements
-        __element_list = _gdx_file[_key].elements
+    __symbol = _gdx_file[_key]
+    if isinstance(__symbol, gams.GAMSSet):  # a Set contains only elements
+        __element_list = __symbol.elements
         return __element_list
-    elif isinstance(_gdx_file[_key], gams.GAMSParameter):
-        return _gdx_file[_key].to_pandas()
+    elif is_parameter(__symbol):
+        if isinstance(_gdx_file, GdxSymbolCache):
+            # memoized, the view returned shares the data of the cache
+            return _gdx_file.to_pandas(_key)
+        return __symbol.to_pandas()
 
 
-def prepare_gdx_ts2spineopt(_gdx_file, _key, __domain_in_spine=None):
+def select_levels(_series, _level_names, selectors, _domain_mappings=None):
+    """
+    :param _series: a pandas Series with a (Multi)Index, e.g. a gdx parameter
+    :param _level_names: names of the leading index levels, selectors refer to these
+    :param selectors: a dictionary mapping a level name to a collection of labels to keep,
+                      or to a function returning True for the labels to keep, e.g. {"node": {"75FI"}, "f": {"f00"}}
+    :param _domain_mappings: a dictionary mapping gdx domain names to the level names, see domain2spineopt()
+    :return: the rows of _series with the selected labels
+    """
+    if not selectors:
+        return _series
+    __mask = np.ones(len(_series), dtype=bool)
+    for __name, __labels in selectors.items():
+        if _domain_mappings is not None:
+            __name = _domain_mappings.get(__name, __name)
+        __values = _series.index.get_level_values(list(_level_names).index(__name))
+        if callable(__labels):
+            __unique = __values.unique()
+            __labels = __unique[[bool(__labels(x)) for x in __unique]]
+        __mask &= __values.isin(list(__labels))
+    return _series[__mask]
+
+
+def prepare_gdx_ts2spineopt(_gdx_file, _key, __domain_in_spine=None, selectors=None):
     """
     :param _gdx_file: a *.gdx file instance of class gdx2py.gdxfile.GdxFile
     :param _key: name of a symbol in "ts_cf", "ts_influx", "ts_reserveDemand"
     :param __domain_in_spine:
+    :param selectors: a dictionary mapping a domain (by its gdx or spine name) to the labels to keep,
+                      applied before pivoting the time steps, see select_levels()
     :return: a dataframe organised under spine opt object_class, dimension (int)
     """
     __df = get_gdx_entry(_gdx_file, _key)
@@ -154,6 +356,7 @@ def prepare_gdx_ts2spineopt(_gdx_file, _key, __domain_in_spine=None):
     __dimension = _gdx_file[_key].dimension
     if __domain_mappings is None:
         print("The domain for SpineOpt needs specifying in key argument")
+        __df = select_levels(__df, __domain_in_spine or [], selectors)
         __df = __df.unstack(level=-1)
         # the last dimension should be "t"
         __df.index.set_names(__domain_in_spine, inplace=True)
@@ -166,10 +369,12 @@ def prepare_gdx_ts2spineopt(_gdx_file, _key, __domain_in_spine=None):
                 )
             ]
             __df.index.set_names(__domain_in_spine, inplace=True)
+            __df = select_levels(__df, __domain_in_spine, selectors, __domain_mappings)
             __df = __df.unstack(level=__domain_in_spine[-1]).reset_index()
             # the last item of domain_spine, i.e. domain_spine[-1], should be "t"
             __domain_in_spine.remove(__domain_in_spine[-1])
         else:
+            __df = select_levels(__df, list(__domain_mappings.values()), selectors, __domain_mappings)
             __df = __df.unstack(level=-1)
             # the last dimension should be "t"
             __domain_in_spine = [x for x in list(__domain_mappings.values())]
@@ -181,9 +386,72 @@ def prepare_gdx_ts2spineopt(_gdx_file, _key, __domain_in_spine=None):
     return __df, __dimension
 
 
+def gdx_ts_block(_df, _dimension, commodity, node, _time_index, _minima=None, factor=1.0):
+    """
+    vectorized conversion of the rows of prepare_gdx_ts2spineopt() matching commodity and node,
+    all rows are processed as one 2-D array instead of row by row
+    :param _df: a dataframe returned by prepare_gdx_ts2spineopt(), with a row per (commodity, node, alternative)
+    :param _dimension: number of label columns in _df, i.e. the time steps start from this column
+    :param commodity: a string contained in the commodity of the selected rows
+    :param node: a string contained in the node of the selected rows
+    :param _time_index: time index of the time series, its length is that of the time series
+    :param _minima: values with an absolute value not greater than this are set to 0.0, None to keep them all
+    :param factor: a scalar multiplying the values, e.g. the capacity for capacity factors
+    :return: a dataframe of the label columns of the selected rows,
+             a 2-D array of the values with a row per selected row (sign flipped, NaN values filled by 0.0),
+             an array of the number of valid values per row
+    """
+    _selected = np.logical_and(
+        _df["commodity"].astype(str).str.contains(commodity, regex=False).to_numpy(),
+        _df["node"].astype(str).str.contains(node, regex=False).to_numpy(),
+    )
+    _labels = _df.loc[_selected, _df.columns[:_dimension]].reset_index(drop=True)
+    _block = _df.loc[_selected, _df.columns[_dimension:]].to_numpy(dtype=np.float64)
+    _n_columns = _block.shape[1]
+    # skip NaN values at the beginning of each row
+    _offsets = np.argmax(~np.isnan(_block), axis=1)
+    _lengths = np.minimum(len(_time_index), _n_columns - _offsets)
+    _columns = np.minimum(_offsets[:, np.newaxis] + np.arange(len(_time_index)), _n_columns - 1)
+    _values = -np.take_along_axis(_block, _columns, axis=1)
+    # control accuracy
+    if _minima is not None:
+        _values[np.abs(_values) <= _minima] = 0.0
+    # fill NaN value
+    _values[np.isnan(_values)] = 0.0
+    if factor != 1.0:
+        _values *= factor
+    return _labels, _values, _lengths
+
+
+def _gdx_ts_block2importer(_labels, _values, _lengths, _time_index, _has_base_alternative, **_bound):
+    """
+    :param _labels: a dataframe of commodity, node and alternative per time series, see gdx_ts_block()
+    :param _values: a 2-D array of values with a row per time series, or an iterable of such rows
+    :param _lengths: an array of the number of valid values per row
+    :param _time_index: time index of the time series
+    :param _has_base_alternative: True if a copy of f00 is set to be the base alternative, f01 otherwise
+    :param _bound: target, max_rows and max_bytes of a bound importer, see SpineDBImporter
+    :return: an instance of class SpineDBImporter with the time series as the demand of the nodes
+    """
+    _importer = SpineDBImporter(**_bound)
+    _time_index = pd.DatetimeIndex(_time_index)
+    _base_alternative = "f00" if _has_base_alternative else "f01"
+    for _commodity, _node, _alternative, _row, _length in zip(
+            _labels["commodity"], _labels["node"], _labels["alternative"], _values, _lengths
+    ):
+        _importer.objects += [("commodity", _commodity), ("node", _node)]
+        _importer.alternatives.append(_alternative)
+        _ts = time_series_value(_time_index, _row[:_length], repeat=True)
+        if _alternative == _base_alternative:
+            _importer.object_parameter_values.append(("node", _node, "demand", _ts))
+        _importer.object_parameter_values.append(("node", _node, "demand", _ts, _alternative))
+        _importer.relationships.append(("node__commodity", (_node, _commodity)))
+    return _importer
+
+
 # TODO: finish variable description
 def gdx_ts_influx2spineopt(_gdx_file, _key, commodity, node, _time_index,
-                           _domain_in_spine=None, _has_base_alternative=True, _minima=None
+                           _domain_in_spine=None, _has_base_alternative=True, _minima=None, selectors=None
                            ):
     """
 
@@ -195,60 +463,25 @@ def gdx_ts_influx2spineopt(_gdx_file, _key, commodity, node, _time_index,
     :param _domain_in_spine:
     :param _has_base_alternative:
     :param _minima:
+    :param selectors: further labels to keep per domain, e.g. {"f": {"f00", "f01"}}, see prepare_gdx_ts2spineopt()
     :return:
     """
-    __df, __dimension = prepare_gdx_ts2spineopt(_gdx_file, _key, __domain_in_spine=_domain_in_spine)
-    _ts_influx_importer = SpineDBImporter()
+    # only the rows of the commodity and node are pivoted
+    _selectors = {"commodity": lambda x: commodity in x, "node": lambda x: node in x, **(selectors or dict())}
+    __df, __dimension = prepare_gdx_ts2spineopt(
+        _gdx_file, _key, __domain_in_spine=_domain_in_spine, selectors=_selectors
+    )
     if "f00" not in __df["alternative"]:
         _has_base_alternative = False
-
-    for i, row in __df.iterrows():
-        if any(
-                [commodity not in row["commodity"], node not in row["node"]]
-        ):
-            continue
-        if ("commodity", row["commodity"]) not in _ts_influx_importer.objects:
-            _ts_influx_importer.objects += [
-                ("commodity", row["commodity"])
-            ]
-        if (row["alternative"]) not in _ts_influx_importer.alternatives:
-            _ts_influx_importer.alternatives.append(row["alternative"])
-        __position = __dimension
-        while pd.isnull(row.iloc[__position]):
-            __position += 1
-        # Assume the length of all TimeSeries records are the same
-        # Skip NaN value at the beginning
-        _ts_influx = pd.Series([-x for x in list(row.iloc[__position:(__position + len(_time_index) + 1)])])
-        # control accuracy
-        if _minima is not None:
-            _ts_influx[abs(_ts_influx) <= _minima] = 0.0
-        # fill NaN value (can be obtained by np.nan)
-        _ts_influx.fillna(0.0, inplace=True)
-        _ts_influx = dict(zip(_time_index, _ts_influx.to_list()))
-        _ts_influx_importer.objects += [
-            (obj_class, row[obj_class]) for obj_class in ["commodity", "node"] if
-            (obj_class, row[obj_class]) not in _ts_influx_importer.objects
-        ]
-        if any([
-            _has_base_alternative and "f00" == row["alternative"],
-            all([not _has_base_alternative, "f01" == row["alternative"]])
-        ]):
-            #  a copy of f00 is set to be the base alternative, f01 otherwise
-            _ts_influx_importer.object_parameter_values += [
-                ("node", row["node"], "demand",
-                 {"type": "time_series", "data": _ts_influx, "index": {"repeat": True}},),
-            ]
-        _ts_influx_importer.object_parameter_values += [
-            ("node", row["node"], "demand",
-             {"type": "time_series", "data": _ts_influx, "index": {"repeat": True}}, row["alternative"]),
-        ]
-        _ts_influx_importer.relationships.append(("node__commodity", (row["node"], row["commodity"])))
-    return _ts_influx_importer
+    # Assume the length of all TimeSeries records are the same
+    _labels, _ts_influx, _lengths = gdx_ts_block(__df, __dimension, commodity, node, _time_index, _minima=_minima)
+    return _gdx_ts_block2importer(_labels, _ts_influx, _lengths, _time_index, _has_base_alternative)
 
 
 # TODO: finish this block
 def gdx_ts_cf2spineopt(_gdx_file, _key, commodity, node, _time_index, total_capacity,
-                       _domain_in_spine=None, _has_base_alternative=True, _minima=None, is_source_node=True
+                       _domain_in_spine=None, _has_base_alternative=True, _minima=None, is_source_node=True,
+                       selectors=None
                        ):
     """
 
@@ -264,57 +497,104 @@ def gdx_ts_cf2spineopt(_gdx_file, _key, commodity, node, _time_index, total_capa
     :param is_source_node: True if the ts_cf data is to be modelled as a source node,
            where total_capacity should be provided,
            otherwise the ts_cf is to be modelled as parameter unit_conv_cap_to_flow of relationship unit__to_node
+    :param selectors: further labels to keep per domain, e.g. {"f": {"f00", "f01"}}, see prepare_gdx_ts2spineopt()
     :return:
     """
-    __df, __dimension = prepare_gdx_ts2spineopt(_gdx_file, _key, __domain_in_spine=_domain_in_spine)
-    _ts_cf_importer = SpineDBImporter()
+    # only the rows of the commodity and node are pivoted
+    _selectors = {"commodity": lambda x: commodity in x, "node": lambda x: node in x, **(selectors or dict())}
+    __df, __dimension = prepare_gdx_ts2spineopt(
+        _gdx_file, _key, __domain_in_spine=_domain_in_spine, selectors=_selectors
+    )
     if "f00" not in __df["alternative"]:
         _has_base_alternative = False
+    # available inflow from source node, the accuracy is controlled before scaling by the capacity
+    _labels, _ts_influx, _lengths = gdx_ts_block(
+        __df, __dimension, commodity, node, _time_index, _minima=_minima, factor=total_capacity
+    )
+    return _gdx_ts_block2importer(_labels, _ts_influx, _lengths, _time_index, _has_base_alternative)
 
-    for i, row in __df.iterrows():
-        if any(
-                [commodity not in row["commodity"], node not in row["node"]]
-        ):
-            continue
-        if ("commodity", row["commodity"]) not in _ts_cf_importer.objects:
-            _ts_cf_importer.objects += [
-                ("commodity", row["commodity"])
-            ]
-        if (row["alternative"]) not in _ts_cf_importer.alternatives:
-            _ts_cf_importer.alternatives.append(row["alternative"])
-        __position = __dimension
-        while pd.isnull(row.iloc[__position]):
-            __position += 1
-        # Assume the length of all TimeSeries records are the same
-        # Skip NaN value at the beginning
-        _ts_cf = pd.Series([-x for x in list(row.iloc[__position:(__position + len(_time_index) + 1)])])
-        # control accuracy
-        if _minima is not None:
-            _ts_cf[abs(_ts_cf) <= _minima] = 0.0
-        # fill NaN value (can be obtained by np.nan)
-        _ts_cf.fillna(0.0, inplace=True)
-        # available inflow from source node
-        _ts_influx = _ts_cf * total_capacity
-        _ts_influx = dict(zip(_time_index, _ts_influx.to_list()))
-        _ts_cf_importer.objects += [
-            (obj_class, row[obj_class]) for obj_class in ["commodity", "node"] if
-            (obj_class, row[obj_class]) not in _ts_cf_importer.objects
-        ]
-        if any([
-            _has_base_alternative and "f00" == row["alternative"],
-            all([not _has_base_alternative, "f01" == row["alternative"]])
-        ]):
-            #  a copy of f00 is set to be the base alternative, f01 otherwise
-            _ts_cf_importer.object_parameter_values += [
-                ("node", row["node"], "demand",
-                 {"type": "time_series", "data": _ts_influx, "index": {"repeat": True}},),
-            ]
-        _ts_cf_importer.object_parameter_values += [
-            ("node", row["node"], "demand",
-             {"type": "time_series", "data": _ts_influx, "index": {"repeat": True}}, row["alternative"]),
-        ]
-        _ts_cf_importer.relationships.append(("node__commodity", (row["node"], row["commodity"])))
-    return _ts_cf_importer
+
+def _decode_gdx_ts_chunk(_path, _key, commodity, node, _length, _minima=None, selectors=None, cache_dir=None):
+    """
+    decode the segment of one gdx file of a chunked time series, run in worker processes by
+    stream_gdx_ts_influx2spineopt(), hence the result consists of plain tuples and arrays instead of dataframes
+    :return: a list of (commodity, node, alternative) per time series, a 2-D array of their values,
+             an array of the number of valid values per time series,
+             False if the data has no base alternative (see gdx_ts_influx2spineopt())
+    """
+    _selectors = {"commodity": lambda x: commodity in x, "node": lambda x: node in x, **(selectors or dict())}
+    _gdx_file = io_config.open_gdx(_path, cache_dir=cache_dir)
+    try:
+        __df, __dimension = prepare_gdx_ts2spineopt(_gdx_file, _key, selectors=_selectors)
+    finally:
+        _gdx_file.close()
+    _has_base_alternative = "f00" in __df["alternative"]
+    _labels, _values, _lengths = gdx_ts_block(__df, __dimension, commodity, node, range(_length), _minima=_minima)
+    return [tuple(x) for x in _labels.itertuples(index=False)], _values, _lengths, _has_base_alternative
+
+
+def stream_gdx_ts_influx2spineopt(chunks, _key, commodity, node, _minima=None, selectors=None, cache_dir=None,
+                                  max_workers=1, target=None, max_rows=None, max_bytes=None):
+    """
+    streaming conversion of a time series split in consecutive gdx files, e.g. t000000.gdx, t000024.gdx, ...
+    each file is opened only when reached and its segment is copied into a buffer preallocated per time series
+    :param chunks: a list of tuples (path of a gdx file, time index of its segment) in chronological order
+    :param _key: name of the symbol, e.g. "ts_influx"
+    :param commodity: see gdx_ts_influx2spineopt()
+    :param node: see gdx_ts_influx2spineopt()
+    :param _minima: see gdx_ts_influx2spineopt()
+    :param selectors: see gdx_ts_influx2spineopt(), functions in them must be picklable when max_workers > 1
+    :param cache_dir: see io_config.open_gdx()
+    :param max_workers: number of processes decoding the files in parallel, None for the number of processors,
+                        1 to decode them one after another in this process
+    :param target: a Spine database instance of class gdx2spinedb.spinedb.SpinedbIO, None to collect all rows,
+                   otherwise the returned importer is bound to it and the demands are flushed into it in batches
+                   within max_rows and max_bytes while the buffer of each time series is released once written
+    :param max_rows: see SpineDBImporter
+    :param max_bytes: see SpineDBImporter
+    :return: an instance of class SpineDBImporter with the whole time series as the demand of the nodes,
+             with the rows not flushed yet if bound, see SpineDBImporter.import_data()
+    """
+    _offsets = np.cumsum([0] + [len(_time_index) for _, _time_index in chunks])
+    _time_stamps = np.empty(_offsets[-1], dtype="datetime64[ns]")
+    _buffers = dict()
+    _labels = list()
+    _has_base_alternative = True
+    _arguments = (
+        [_path for _path, _ in chunks], [_key] * len(chunks), [commodity] * len(chunks), [node] * len(chunks),
+        [len(_time_index) for _, _time_index in chunks], [_minima] * len(chunks), [selectors] * len(chunks),
+        [cache_dir] * len(chunks),
+    )
+    _executor = None if max_workers == 1 else ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        # the segments come in chronological order also when decoded in parallel
+        _segments = (map if _executor is None else _executor.map)(_decode_gdx_ts_chunk, *_arguments)
+        for (_, _time_index), _start, _end, _segment in zip(chunks, _offsets[:-1], _offsets[1:], _segments):
+            print(f"Converting value of {_key} under {commodity} as the demand of node {node} "
+                  f"from the {_start}th to {_end - 1}th time step")
+            _segment_labels, _values, _lengths, _has_base = _segment
+            if _start == 0 and not _has_base:
+                _has_base_alternative = False
+            _time_stamps[_start:_end] = pd.DatetimeIndex(_time_index).values
+            for _label, _row, _length in zip(_segment_labels, _values, _lengths):
+                _buffer = _buffers.get(_label)
+                if _buffer is None:
+                    # a time series is zero before its first segment
+                    _buffer = _buffers[_label] = np.zeros(_offsets[-1])
+                    _labels.append(_label)
+                _buffer[_start:_start + _length] = _row[:_length]
+    finally:
+        if _executor is not None:
+            _executor.shutdown()
+    # the buffers are handed over one at a time, a flushed time series is not kept in memory
+    _values = (_buffers.pop(x) for x in _labels)
+    _labels = pd.DataFrame(_labels, columns=["commodity", "node", "alternative"])
+    _lengths = np.full(len(_labels), _offsets[-1])
+    # the segments are regular but the whole series is not if a leap day is skipped in between
+    return _gdx_ts_block2importer(
+        _labels, _values, _lengths, pd.DatetimeIndex(_time_stamps), _has_base_alternative,
+        target=target, max_rows=max_rows, max_bytes=max_bytes
+    )
 
 
 if __name__ == '__main__':
@@ -326,48 +606,25 @@ if __name__ == '__main__':
                            gdx_file_dir="/Case_study_B3/datasets/raw_data/VabisysData/ts_influx/",
                            output_spinesb_dir=
                            "sqlite:///backbone-to-spineopt\\Temp\\datasets\\backbone2spine_test_py.sqlite",
-                           json_dir="/SpineOpt/data/spineopt_template.json"
+                           json_dir="/SpineOpt/data/spineopt_template.json",
+                           max_bytes=2 ** 30
                            ):
         os.chdir(work_dir)
         gdx_file_dir = work_dir + gdx_file_dir
         json_dir = work_dir + json_dir
-        influx_importer = SpineDBImporter()
-        ts_values = list()
-        overall_time_index = list()
-        while start_hour < start_hour_end:
-            dir_bb_gdx = gdx_file_dir + f"t{start_hour:06d}.gdx"
-            bb_gdx = io_config.open_gdx(dir_bb_gdx)
-            _output_db = io_config.open_spinedb(output_spinesb_dir, is_output=recreate_output)
-            if import_json:
-                io_config.import_json(json_dir, _output_db)
-            _time_index = generate_time_index(2020, relative_pos=(start_hour, temporal_step - 1))
-            _time_index = [str(x) for x in _time_index]
-            print(f"Converting value of {key} under {commodity} as the demand of node {node} "
-                  f"from the {start_hour}th to {start_hour + temporal_step - 1}th hour")
-            _temp_importer = gdx_ts_influx2spineopt(bb_gdx, key, commodity, node, _time_index)
-            for attr in dir(influx_importer):
-                if attr[:2] != "__":
-                    setattr(influx_importer, attr, getattr(_temp_importer, attr))
-            # list of values ordered with respect to alternatives
-            ts_value_segment = [list(x[3]["data"].values()) for x in _temp_importer.object_parameter_values]
-            _time_index = [list(x[3]["data"].keys()) for x in _temp_importer.object_parameter_values]
-            if all([ts_values == [], overall_time_index == []]):
-                ts_values += ts_value_segment
-                overall_time_index += _time_index
-            elif all([ts_values != [], overall_time_index != []]):
-                ts_values = [(alternative + ts_value_segment[i]) for i, alternative in enumerate(ts_values)]
-                overall_time_index = [
-                    (alternative + _time_index[i]) for i, alternative in enumerate(overall_time_index)
-                ]
-            else:
-                print("The time_index is inconsistent with the ts_values")
-            bb_gdx.close()
-            recreate_output = False
-            import_json = False
-            start_hour += temporal_step
-        __data = [dict(zip(overall_time_index[i], alternative)) for i, alternative in enumerate(ts_values)]
-        for i, alternative in enumerate(influx_importer.object_parameter_values):
-            alternative[3]["data"] = __data[i]
+        chunks = [
+            (gdx_file_dir + f"t{x:06d}.gdx", generate_time_index(2020, relative_pos=(x, temporal_step - 1)))
+            for x in range(start_hour, start_hour_end, temporal_step)
+        ]
+        _output_db = io_config.open_spinedb(output_spinesb_dir, create_new_db=recreate_output)
+        if import_json:
+            io_config.import_json(json_dir, _output_db)
+        # the files are decoded in parallel, one process per processor,
+        # the demands are written in batches of at most about max_bytes
+        influx_importer = stream_gdx_ts_influx2spineopt(
+            chunks, key, commodity, node, max_workers=None, target=_output_db, max_bytes=max_bytes
+        )
+        # the rows left are flushed
         influx_importer.import_data(_output_db)
         return influx_importer
 
@@ -8,6 +8,7 @@ import argparse
 import sys
 import json
 from gdx2py import GdxFile
+from gdx2spinedb.gdx_cache import DEFAULT_MAX_BYTES, GdxSymbolCache
 from gdx2spinedb.spinedb import SpinedbIO  # pylint: disable=import-error
 
 # %%
@@ -27,6 +28,13 @@ def get_argument(input_format):
                             help="Input database url, format: sqlite:///database_directory\\database_name.sqlite")
     elif input_format == "GDX":
         parser.add_argument("input_gdx", help="Input gdx file")
+        parser.add_argument(
+            "--gdx-cache",
+            help="Keep the parameters of the gdx file in columnar form in this directory for later runs",
+            default=None,
+            metavar="CACHE_DIR",
+            dest="gdx_cache_dir",
+        )
     parser.add_argument("output_db",
                         help="Output database url, format: sqlite:///database_directory\\database_name.sqlite")
     parser.add_argument(
@@ -42,12 +50,31 @@ def get_argument(input_format):
         action="store_true",
         dest="create",
     )
+    parser.add_argument(
+        "--staged",
+        help="Build a re-created output database in memory and copy it to the output url when done, "
+             "only for scripts that publish it, e.g. gdx_export.py",
+        action="store_true",
+        dest="staged",
+    )
+    parser.add_argument(
+        "--compact-time-series",
+        help="Write constant repeating time series as scalars and those stepping between months as time patterns",
+        action="store_true",
+        dest="compact",
+    )
     args = parser.parse_args()
     return args
 
 
 # open needed data files per parsed system arguments
-def open_gdx(arg):
+def open_gdx(arg, max_bytes=DEFAULT_MAX_BYTES, cache_dir=None):
+    """
+    :param arg: path of the gdx file
+    :param max_bytes: memory cap of the symbols memoized in pandas form, None for no cap
+    :param cache_dir: directory to keep the parameters of the file in columnar form across runs, None for no cache
+    :return: the opened file wrapped in gdx2spinedb.gdx_cache.GdxSymbolCache
+    """
     # %%
     # Open input gdx file
     print("Importing from gdx data file. . .")
@@ -59,20 +86,23 @@ def open_gdx(arg):
     except OSError as e:
         print(f"Error: {e}, '{arg}'")
         sys.exit(1)
-    return gdx
+    return GdxSymbolCache(gdx, max_bytes=max_bytes, cache_dir=cache_dir)
 
 
-def open_spinedb(arg, create_new_db=False):
+def open_spinedb(arg, create_new_db=False, staged=False, compact=False):
     """
     :param arg:
     :param create_new_db: True if to recreate a new spineopt db, default False
+    :param staged: True to build the recreated db in memory, it is copied to arg by SpinedbIO.publish(),
+                   only for scripts that publish the db, see reject_staged()
+    :param compact: True to write time series values in their compact form, see SpinedbIO
     :return:
     """
     # %%
     # Open spine database
     print(f"Opening Spine DB at '{arg}'. . .")
     try:
-        output_db = SpinedbIO(arg, create_new_db)
+        output_db = SpinedbIO(arg, create_new_db, staged=create_new_db and staged, compact=compact)
     except RuntimeError as e:
         print(e)
         sys.exit(1)
@@ -93,28 +123,40 @@ def import_json(arg, target_db):
     target_db.commit("Import JSON data")
 
 
+def reject_staged(args):
+    """
+    exit for the --staged option in scripts that write to the output db without publishing it
+    :param args: parsed arguments, see get_argument()
+    """
+    if getattr(args, "staged", False):
+        print("Error: --staged is only supported when the output database is published, e.g. by gdx_export.py")
+        sys.exit(1)
+
+
 def open_gdx2spine_io(args):
-    gdx = open_gdx(args.input_gdx)
-    output_db = open_spinedb(args.output_db, create_new_db=args.create)
+    gdx = open_gdx(args.input_gdx, cache_dir=args.gdx_cache_dir)
+    output_db = open_spinedb(args.output_db, create_new_db=args.create, staged=args.staged, compact=args.compact)
     if args.json_path:
         import_json(args.json_path, output_db)
     return gdx, output_db
 
 
 def open_spine2spineopt_io(args):
+    reject_staged(args)
     input_spinedb = open_spinedb(args.input_spinedb)
-    output_db = open_spinedb(args.output_db, create_new_db=args.create)
+    output_db = open_spinedb(args.output_db, create_new_db=args.create, staged=args.staged, compact=args.compact)
     if args.json_path:
         import_json(args.json_path, output_db)
     return input_spinedb, output_db
 
 
 def open_config_spineopt_model_io(args):
+    reject_staged(args)
     source_spineopt_db = open_spinedb(args.input_spinedb)
     if args.input_spinedb == args.output_db:
         output_db = source_spineopt_db
     else:
-        output_db = open_spinedb(args.output_db, create_new_db=args.create)
+        output_db = open_spinedb(args.output_db, create_new_db=args.create, staged=args.staged, compact=args.compact)
     if args.json_path:
         import_json(args.json_path, output_db)
     return source_spineopt_db, output_db
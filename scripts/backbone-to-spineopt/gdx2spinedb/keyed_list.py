@@ -0,0 +1,213 @@
+"""Module defines an insertion-ordered list of import rows that is indexed by the natural key of the rows
+"""
+
+
+def entity_key(entity):
+    """Object name, or object names of a relationship as a tuple
+    """
+    if isinstance(entity, str):
+        return entity
+    return tuple(entity)
+
+
+def name_key(row):
+    """Key of alternatives and scenarios, given either as a name or as a tuple starting with the name
+    """
+    if isinstance(row, str):
+        return row
+    return row[0]
+
+
+def object_key(row) -> tuple:
+    """(class, object) of an object row
+    """
+    return row[0], row[1]
+
+
+def relationship_key(row) -> tuple:
+    """(class, object names) of a relationship row
+    """
+    return row[0], entity_key(row[1])
+
+
+def parameter_value_key(row) -> tuple:
+    """(class, entity, parameter, alternative) of a parameter value row, the alternative defaults to 'Base'
+    """
+    _alternative = row[4] if len(row) > 4 else "Base"
+    return row[0], entity_key(row[1]), row[2], _alternative
+
+
+def row_key(row) -> tuple:
+    """The whole row, e.g. of object groups and tool feature methods
+    """
+    return tuple(row)
+
+
+def leading_pair_key(row) -> tuple:
+    """The first two items of a row, e.g. (scenario, alternative) of scenario alternatives
+    """
+    return row[0], row[1]
+
+
+class KeyedList(list):
+    """List of rows that keeps one row per key, with constant-time membership tests
+
+    Appending a row whose key is already in the list has no effect, i.e. the first row wins
+    as when duplicates are imported into a Spine database in one go.
+    Membership tests compare keys, e.g. ('node', 'n1') in objects is True for ('node', 'n1', 'description').
+    upsert() replaces the row with the same key instead, i.e. the last writer wins.
+    Example::
+
+        objects = KeyedList(object_key, [('node', 'n1')])
+        objects += [('node', 'n1'), ('node', 'n2')]  # ('node', 'n1') is kept once
+    """
+
+    # called with each row added by append() or upsert(), e.g. to check the memory budget of a bound importer
+    on_added = None
+
+    def __init__(self, key, rows=()):
+        """
+        Args:
+            key (Callable): function returning the hashable key of a row
+            rows (Iterable): initial rows
+        """
+        super().__init__()
+        self._key = key
+        self._positions = dict()
+        # keys of rows removed by take()
+        self._taken = set()
+        self.extend(rows)
+
+    def __reduce__(self):
+        return self.__class__, (self._key, list(self)), {"_taken": self._taken}
+
+    def _reindex(self):
+        """Rebuild the key index after rows have been removed or moved
+        """
+        self._positions = {self._key(row): i for i, row in enumerate(self)}
+
+    def key(self, row):
+        """Key of a row
+        """
+        return self._key(row)
+
+    def position(self, row):
+        """Position of the row with the same key as row, None if there is no such row
+        """
+        return self._positions.get(self._key(row))
+
+    def append(self, row):
+        _key = self._key(row)
+        if _key in self._positions or _key in self._taken:
+            return None
+        self._positions[_key] = len(self)
+        super().append(row)
+        if self.on_added is not None:
+            self.on_added(row)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def __iadd__(self, rows):
+        self.extend(rows)
+        return self
+
+    def upsert(self, row):
+        """Add a row or replace the row with the same key in place, i.e. the last writer wins
+
+        Returns:
+            replaced (bool): True if a row was replaced
+        """
+        _key = self._key(row)
+        _position = self._positions.get(_key)
+        if _position is None:
+            # a row with a taken key is added again to override the one taken
+            self._positions[_key] = len(self)
+            super().append(row)
+            _replaced = False
+        else:
+            super().__setitem__(_position, row)
+            _replaced = True
+        if self.on_added is not None:
+            self.on_added(row)
+        return _replaced
+
+    def take(self) -> list:
+        """Remove and return all rows, e.g. to import them into a database
+
+        The keys of the rows are kept, hence rows with the same keys are still ignored on append.
+        """
+        _rows = list(self)
+        self._taken.update(self._positions)
+        super().clear()
+        self._positions.clear()
+        return _rows
+
+    def __contains__(self, row):
+        try:
+            _key = self._key(row)
+        except (IndexError, TypeError):
+            return False
+        return _key in self._positions or _key in self._taken
+
+    def copy(self):
+        return self.__class__(self._key, self)
+
+    def insert(self, index, row):
+        if row in self:
+            return None
+        super().insert(index, row)
+        self._reindex()
+
+    def __setitem__(self, index, rows):
+        if isinstance(index, int):
+            _old_key = self._key(self[index])
+            _new_key = self._key(rows)
+            if _new_key == _old_key:
+                super().__setitem__(index, rows)
+                return None
+            if _new_key not in self._positions:
+                super().__setitem__(index, rows)
+                del self._positions[_old_key]
+                self._positions[_new_key] = index % len(self)
+                return None
+        super().__setitem__(index, rows)
+        _n_rows = len(self)
+        self._reindex()
+        if len(self._positions) != _n_rows:
+            # rows with duplicate keys were set, keep the first one of each key
+            _rows = list(self)
+            super().clear()
+            self._positions.clear()
+            for row in _rows:
+                _key = self._key(row)
+                if _key not in self._positions:
+                    self._positions[_key] = len(self)
+                    super().append(row)
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._reindex()
+
+    def pop(self, index=-1):
+        row = super().pop(index)
+        self._reindex()
+        return row
+
+    def remove(self, row):
+        super().remove(row)
+        self._reindex()
+
+    def clear(self):
+        super().clear()
+        self._positions.clear()
+        self._taken.clear()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._reindex()
+
+    def reverse(self):
+        super().reverse()
+        self._reindex()
@@ -0,0 +1,150 @@
+"""Module defines a multi-key graph index over the relationships of an exported Spine database
+"""
+
+from gdx2spinedb.export_index import as_export_index
+
+# Backbone relationship classes the bb2spineopt converters navigate, e.g. to index them ahead of parallel conversion
+BACKBONE_GRAPH_CLASSES = (
+    "grid__node__unit__io", "flow__unit", "grid__node", "unit__constraint__node", "node__emission", "grid__node__node",
+)
+
+
+class RelationshipGraph(object):
+    """Relationships indexed by each of their objects, both per position and regardless of the position
+
+    A relationship of a class is an edge between its objects, e.g. ('elec', '75FI', '75FI_Nuclear', 'output')
+    of grid__node__unit__io. Lookups go through the shortest list of relationships sharing one of the given objects,
+    i.e. they cost the degree of the object instead of a scan over all relationships.
+    Relationships are returned as tuples of object names in the order of the export.
+    Example::
+
+        graph = RelationshipGraph(export['relationships'])
+        graph.match('grid__node__unit__io', 'elec', '75FI')  # grid elec and node 75FI
+        graph.objects('grid__node__unit__io', 3, None, '75FI', '75FI_Nuclear')  # io directions of a unit at a node
+        graph.containing('grid__node', '75FI_fuel')  # any position
+    """
+
+    def __init__(self, relationships=(), classes=None):
+        """
+        Args:
+            relationships (Iterable): relationship rows of an export, i.e. (class name, object names)
+            classes (Iterable, optional): names of the classes to index, None for all
+        """
+        _classes = None if classes is None else set(classes)
+        self._entities = dict()
+        self._at = dict()
+        self._with = dict()
+        for row in relationships:
+            if _classes is None or row[0] in _classes:
+                self.add(row[0], row[1])
+
+    def add(self, class_name: str, entity):
+        """Index a relationship
+
+        Args:
+            class_name (str): name of the relationship class
+            entity (list or tuple): object names of the relationship
+        """
+        _entity = tuple(entity)
+        self._entities.setdefault(class_name, list()).append(_entity)
+        for position, name in enumerate(_entity):
+            self._at.setdefault((class_name, position, name), list()).append(_entity)
+        for name in dict.fromkeys(_entity):
+            self._with.setdefault((class_name, name), list()).append(_entity)
+
+    def entities(self, class_name: str) -> list:
+        """All relationships of a class
+        """
+        return self._entities.get(class_name, [])
+
+    def match(self, class_name: str, *pattern) -> list:
+        """Relationships of a class with the given object names at the given positions
+
+        Args:
+            class_name (str): name of the relationship class
+            pattern (str): object names from the first position on, None for any object,
+                the positions after the pattern are free
+
+        Returns:
+            relationships (list): tuples of object names
+        """
+        _fixed = [(i, x) for i, x in enumerate(pattern) if x is not None]
+        if not _fixed:
+            return self.entities(class_name)
+        _candidates = min((self._at.get((class_name, i, x), []) for i, x in _fixed), key=len)
+        return [_entity for _entity in _candidates if all(_entity[i] == x for i, x in _fixed)]
+
+    def containing(self, class_name: str, *names) -> list:
+        """Relationships of a class that contain all the given object names at any position
+
+        Equivalent to [tuple(x[1]) for x in export['relationships'] if x[0] == class_name and all(y in x[1] ...)]
+        """
+        if not names:
+            return self.entities(class_name)
+        _candidates = min((self._with.get((class_name, x), []) for x in names), key=len)
+        return [_entity for _entity in _candidates if all(x in _entity for x in names)]
+
+    def objects(self, class_name: str, position: int, *pattern) -> list:
+        """Distinct object names at a position among the relationships matching a pattern, see match()
+
+        Example::
+
+            graph.objects('grid__node', 0, None, '75FI_fuel')  # grids of a node
+        """
+        return list(dict.fromkeys(_entity[position] for _entity in self.match(class_name, *pattern)))
+
+
+def relationship_graph(export_data) -> RelationshipGraph:
+    """Graph index of the relationships of an export, built once per ExportIndex and kept in its cache
+
+    A class is indexed on its first lookup, see also _LazyRelationshipGraph.index_classes().
+
+    Args:
+        export_data (dict or ExportIndex): obtained via gdx2spinedb.spinedb.SpinedbIO.export_spinedb()
+
+    Returns:
+        graph (RelationshipGraph)
+    """
+    _index = as_export_index(export_data)
+    _graph = _index.cache.get("relationship_graph")
+    if _graph is None:
+        _graph = _index.cache["relationship_graph"] = _LazyRelationshipGraph(_index)
+    return _graph
+
+
+class _LazyRelationshipGraph(RelationshipGraph):
+    """RelationshipGraph over an ExportIndex that indexes a class on its first lookup
+    """
+
+    def __init__(self, export_index):
+        super().__init__()
+        self._index = export_index
+        self._indexed = set()
+
+    def index_classes(self, classes=BACKBONE_GRAPH_CLASSES):
+        """Index classes ahead of their first lookup, e.g. before worker processes inherit the graph
+
+        Args:
+            classes (Iterable): names of relationship classes
+        """
+        for class_name in classes:
+            self._index_class(class_name)
+
+    def _index_class(self, class_name: str):
+        if class_name in self._indexed:
+            return None
+        self._indexed.add(class_name)
+        for row in self._index.rows("relationships", class_name):
+            self.add(class_name, row[1])
+
+    def entities(self, class_name: str) -> list:
+        self._index_class(class_name)
+        return super().entities(class_name)
+
+    def match(self, class_name: str, *pattern) -> list:
+        self._index_class(class_name)
+        return super().match(class_name, *pattern)
+
+    def containing(self, class_name: str, *names) -> list:
+        self._index_class(class_name)
+        return super().containing(class_name, *names)
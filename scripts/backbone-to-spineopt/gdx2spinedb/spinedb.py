@@ -2,25 +2,150 @@
 """
 
 import logging
-
+import os
+import sqlite3
+import tempfile
+import time
+import weakref
+from contextlib import contextmanager
+
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.exc import ArgumentError as SQLAlchemyArgumentError
 from spinedb_api import DiffDatabaseMapping
 from spinedb_api.exception import SpineDBAPIError, SpineIntegrityError
 from spinedb_api import import_functions
 from spinedb_api import export_functions
 from spinedb_api.helpers import create_new_spine_database
+from gdx2spinedb.export_index import ExportIndex
+from gdx2spinedb.keyed_list import parameter_value_key
+from gdx2spinedb.time_series import to_spine_values
+
+# entity types in the order they depend on each other when imported in one go
+IMPORT_ORDER = (
+    "object_classes",
+    "relationship_classes",
+    "parameter_value_lists",
+    "object_parameters",
+    "relationship_parameters",
+    "alternatives",
+    "objects",
+    "object_groups",
+    "relationships",
+    "object_parameter_values",
+    "relationship_parameter_values",
+    "scenarios",
+    "scenario_alternatives",
+    "tools",
+    "features",
+    "tool_features",
+    "tool_feature_methods",
+)
+# parameter values are buffered by key so that a later import overrides an earlier one, as separate imports would
+VALUE_TYPES = ("object_parameter_values", "relationship_parameter_values")
+# memory-backed file system for staged databases, the default temporary directory where there is none
+STAGING_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _remove_staging_file(path: str):
+    """Remove the staging file of a database that was not published, e.g. after a failed build
+    """
+    if os.path.exists(path):
+        logging.info(f"Removing the unpublished staged Spine DB at '{path}'")
+        os.remove(path)
+
+
+class BulkSession(object):
+    """Import data buffered by SpinedbIO.bulk_session() until it is written in one transaction
+    """
+
+    def __init__(self):
+        self.buffers = dict()
+        self.n_imported = dict()
+        self.elapsed = dict()
+
+    def add(self, entity_type: str, data) -> int:
+        """Buffer data of one entity type
+
+        Returns:
+            n_buffered (int): Number of buffered rows
+        """
+        if entity_type in VALUE_TYPES:
+            _buffer = self.buffers.setdefault(entity_type, dict())
+            _n_rows = 0
+            for row in data:
+                _buffer[parameter_value_key(row)] = row
+                _n_rows += 1
+            return _n_rows
+        _buffer = self.buffers.setdefault(entity_type, list())
+        _n_before = len(_buffer)
+        _buffer.extend(data)
+        return len(_buffer) - _n_before
+
+    def rows(self, entity_type: str) -> list:
+        """Buffered rows of one entity type
+        """
+        _buffer = self.buffers[entity_type]
+        if isinstance(_buffer, dict):
+            return list(_buffer.values())
+        return _buffer
+
+    def entity_types(self) -> list:
+        """Buffered entity types in dependency order, unknown types last
+        """
+        _known = [x for x in IMPORT_ORDER if x in self.buffers]
+        return _known + [x for x in self.buffers if x not in IMPORT_ORDER]
+
+    def report(self) -> str:
+        """Summary of buffered and imported rows and elapsed time per entity type
+        """
+        _lines = ["Bulk import:"]
+        for entity_type in self.entity_types():
+            _lines.append(
+                f" {entity_type}: {len(self.buffers[entity_type])} rows buffered, "
+                f"{self.n_imported.get(entity_type, 0)} imported in {self.elapsed.get(entity_type, 0.0):.3f} s"
+            )
+        _lines.append(f" commit: {self.elapsed.get('commit', 0.0):.3f} s")
+        return "\n".join(_lines)
 
 
 class SpinedbIO(object):
     """Class for working with a Spine database, especially when adding data 
     """
 
-    def __init__(self, url: str, create=False):
+    def __init__(self, url: str, create=False, staged=False, compact=False):
         """Open Spine database at url for modifying
-        
+
+        A staged database is created in a temporary SQLite file in memory (see STAGING_DIR),
+        imports and commits go there until publish() copies the database to url.
+        Nothing is written to url if the build fails before.
+        Used as a context manager, the staged database is published when the with-block exits normally
+        and discarded when it raises. The staging file of a database that is neither published nor discarded
+        is removed when the SpinedbIO is garbage collected or the interpreter exits.
+        Example::
+
+            with SpinedbIO(url, staged=True) as spinedb_io:
+                ...  # imports and commits
+        With compact, constant repeating time series are written as scalars and repeating time series stepping
+        between months as time patterns, see gdx2spinedb.time_series.compact_value().
+
+        Args:
+            url (str): database url
+            create (bool): True to create a new database even if there is one at url
+            staged (bool): True to build a new SQLite database in a staging file, implies create
+            compact (bool): True to write time series values in their compact form
+
         Raises:
             RuntimeError: Could not open database
         """
+        self._bulk_session = None
+        self._export_indexes = dict()
+        self._url = url
+        self._compact = compact
+        self._staging_path = None
+        self._staging_finalizer = None
+        if staged:
+            self._create_staged_db(url)
+            return None
         if not create:
             try:
                 self._open_db(url)
@@ -48,6 +173,98 @@ class SpinedbIO(object):
         else:
             self._open_db(url)
 
+    def _create_staged_db(self, url: str):
+        """Create Spine DB in a staging file for the SQLite database at url
+        """
+        try:
+            _database = make_url(url).database
+        except SQLAlchemyArgumentError as e:
+            raise RuntimeError(e)
+        if not url.startswith("sqlite") or not _database:
+            raise RuntimeError(f"Only SQLite database files can be staged, not '{url}'")
+        _handle, self._staging_path = tempfile.mkstemp(suffix=".sqlite", dir=STAGING_DIR)
+        os.close(_handle)
+        os.remove(self._staging_path)
+        # the file takes memory until it is removed, also when the build fails
+        self._staging_finalizer = weakref.finalize(self, _remove_staging_file, self._staging_path)
+        logging.info(f"Staging the new Spine DB for '{url}' at '{self._staging_path}'")
+        self._create_db(f"sqlite:///{self._staging_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Publish a staged database when the with-block exits normally, discard it when the block raises
+        """
+        if exc_type is None:
+            self.publish()
+        else:
+            self.discard()
+        return False
+
+    @property
+    def staged(self) -> bool:
+        """True until a staged database is published
+        """
+        return self._staging_path is not None
+
+    def publish(self):
+        """Copy a staged database to its url with the SQLite backup API and continue working on the copy
+
+        Uncommitted changes are not copied. Does nothing for a database that is not staged.
+
+        Raises:
+            RuntimeError: Called in a bulk session
+        """
+        if self._staging_path is None:
+            return None
+        if self._bulk_session is not None:
+            raise RuntimeError("A staged database cannot be published in a bulk session")
+        _database = make_url(self._url).database
+        t0 = time.time()
+        _source = sqlite3.connect(self._staging_path)
+        _target = sqlite3.connect(_database)
+        try:
+            _source.backup(_target)
+        finally:
+            _target.close()
+            _source.close()
+        logging.info(f"Published the staged Spine DB to '{self._url}' in {time.time() - t0:.3f} s")
+        self._db_map.connection.close()
+        self._staging_finalizer()
+        self._staging_path = None
+        self._export_indexes.clear()
+        self._open_db(self._url)
+
+    def discard(self):
+        """Remove a staged database without writing it to its url, e.g. after a failed build
+
+        The SpinedbIO cannot be used afterwards. Does nothing for a database that is not staged.
+        """
+        if self._staging_path is None:
+            return None
+        self._db_map.connection.close()
+        self._staging_finalizer()
+        self._staging_path = None
+        self._export_indexes.clear()
+        logging.info(f"Discarded the staged Spine DB for '{self._url}'")
+
+    def _import(self, entity_type: str, import_function, data) -> int:
+        """Import data of one entity type, or buffer it while a bulk session is open
+
+        Returns:
+            n_imported (int): Number of imported (or buffered) entities
+        """
+        if entity_type in VALUE_TYPES:
+            data = to_spine_values(data, self._compact)
+        if self._bulk_session is not None:
+            return self._bulk_session.add(entity_type, data)
+        self._export_indexes.clear()
+        n_imported, errors = import_function(self._db_map, data)
+        if errors:
+            self._handle_errors(errors)
+        return n_imported
+
     def import_object_classes(self, class_name) -> int:
         """Add object classes from a list of class name and description tuples
         Example::
@@ -58,11 +275,7 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities
         """
-        n_imported, errors = import_functions.import_object_classes(
-            self._db_map, class_name)
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("object_classes", import_functions.import_object_classes, class_name)
 
     def import_objects(self, objects) -> int:
         """Add objects of specific class from a list of class name and object name tuples
@@ -70,11 +283,7 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities    
         """
-        n_imported, errors = import_functions.import_objects(
-            self._db_map, objects)
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("objects", import_functions.import_objects, objects)
 
     def import_object_parameter_values(self, object_parameter_values) -> int:
         """Import object parameter values from a list of object class name, object name, parameter name and value tuples
@@ -94,12 +303,9 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities
         """
-        n_imported, errors = import_functions.import_object_parameter_values(
-            self._db_map, object_parameter_values
+        return self._import(
+            "object_parameter_values", import_functions.import_object_parameter_values, object_parameter_values
         )
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
 
     def import_object_groups(self, object_groups) -> int:
         """Add objects of specific class from a list of class name and object name tuples
@@ -107,11 +313,7 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities
         """
-        n_imported_members, errors = import_functions.import_object_groups(
-            self._db_map, object_groups)
-        if errors:
-            self._handle_errors(errors)
-        return n_imported_members
+        return self._import("object_groups", import_functions.import_object_groups, object_groups)
 
     def import_relationship_classes(self, class_description) -> int:
         """Imports relationship classes.
@@ -127,12 +329,7 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities
         """
-        n_imported, errors = import_functions.import_relationship_classes(
-            self._db_map, class_description
-        )
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("relationship_classes", import_functions.import_relationship_classes, class_description)
 
     def import_relationships(self, relationships) -> int:
         """Import relationships from a list of relationship name and object name list tuples
@@ -145,12 +342,7 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities    
         """
-        n_imported, errors = import_functions.import_relationships(
-            self._db_map, relationships
-        )
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("relationships", import_functions.import_relationships, relationships)
 
     def import_relationship_parameter_values(self, relationship_parameter_values) -> int:
         """Import relationship parameter values from a list of relationship name,
@@ -159,12 +351,10 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities    
         """
-        n_imported, errors = import_functions.import_relationship_parameter_values(
-            self._db_map, relationship_parameter_values
+        return self._import(
+            "relationship_parameter_values", import_functions.import_relationship_parameter_values,
+            relationship_parameter_values
         )
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
 
     def import_alternatives(self, data) -> int:
         """
@@ -181,10 +371,7 @@ class SpinedbIO(object):
         Returns:
             tuple of int and list: Number of successfully inserted alternatives, list of errors
         """
-        n_imported, errors = import_functions.import_alternatives(self._db_map, data)
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("alternatives", import_functions.import_alternatives, data)
 
     def import_scenarios(self, data) -> int:
         """
@@ -205,10 +392,7 @@ class SpinedbIO(object):
         Returns:
             tuple of int and list: Number of successfully inserted scenarios, list of errors
         """
-        n_imported, errors = import_functions.import_scenarios(self._db_map, data)
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("scenarios", import_functions.import_scenarios, data)
 
     def import_scenario_alternatives(self, data) -> int:
         """
@@ -229,10 +413,7 @@ class SpinedbIO(object):
         Returns:
             tuple of int and list: Number of successfully inserted scenario alternatives, list of errors
         """
-        n_imported, errors = import_functions.import_scenario_alternatives(self._db_map, data)
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("scenario_alternatives", import_functions.import_scenario_alternatives, data)
 
     def import_tool_feature_methods(self, data) -> int:
         """
@@ -249,10 +430,7 @@ class SpinedbIO(object):
         Returns:
             tuple of int and list: Number of successfully inserted tool features, list of errors
         """
-        n_imported, errors = import_functions.import_tool_feature_methods(self._db_map, data)
-        if errors:
-            self._handle_errors(errors)
-        return n_imported
+        return self._import("tool_feature_methods", import_functions.import_tool_feature_methods, data)
 
     def import_data(self, data) -> int:
         """Import data
@@ -263,28 +441,151 @@ class SpinedbIO(object):
         Returns:
             n_imported (int): Number of improrted entities            
         """
+        data = {k: to_spine_values(v, self._compact) if k in VALUE_TYPES else v for k, v in data.items()}
+        if self._bulk_session is not None:
+            return sum(self._bulk_session.add(k, v) for k, v in data.items())
+        self._export_indexes.clear()
         n_imported, errors = import_functions.import_data(self._db_map, **data)
         if errors:
             self._handle_errors(errors)
         return n_imported
 
-    def export_spinedb(self):
+    @contextmanager
+    def bulk_session(self, message="Bulk import"):
+        """Buffer all imports made in the with-block and write them in one transaction on exit
+
+        Entity types are imported once each in dependency order (see IMPORT_ORDER) and committed once.
+        Calls to commit() inside the block are deferred. Nothing is written if the block raises.
+        Data buffered in the session is not visible to export_spinedb() before the block exits.
+        Example::
+
+            with spinedb_io.bulk_session("Converted Backbone model"):
+                importer_1.import_data(spinedb_io)
+                importer_2.import_data(spinedb_io)
+
+        Yields:
+            session (BulkSession): the buffer, with rows and elapsed time per entity type after exit
         """
-        :return:
+        if self._bulk_session is not None:
+            # nested sessions share the outermost buffer
+            yield self._bulk_session
+            return
+        session = BulkSession()
+        self._bulk_session = session
+        try:
+            yield session
+        finally:
+            self._bulk_session = None
+        for entity_type in session.entity_types():
+            t0 = time.time()
+            n_imported, errors = import_functions.import_data(
+                self._db_map, **{entity_type: session.rows(entity_type)}
+            )
+            session.elapsed[entity_type] = time.time() - t0
+            session.n_imported[entity_type] = n_imported
+            if errors:
+                self._handle_errors(errors)
+        t0 = time.time()
+        self.commit(message)
+        session.elapsed["commit"] = time.time() - t0
+        logging.info(session.report())
+
+    def export_spinedb(self, indexed=False, classes=None, parameters=None, alternatives=None):
+        """Export the content of the database, optionally restricted to some classes, parameters and alternatives
+
+        The filters are applied in the database queries, hence parameter values outside them are never loaded.
+        Classes filter classes, their objects, groups, relationships, parameter definitions and values.
+        Parameters filter parameter definitions and values. Alternatives filter alternatives and values.
+        Example::
+
+            spinedb_io.export_spinedb(classes=['unit'], parameters=['number_of_units'], alternatives=['Base'])
+
+        Args:
+            indexed (bool): True to return an ExportIndex with constant-time lookups,
+                which is memoized per filter until the database is modified or committed
+            classes (list, optional): names of object and relationship classes, None for all
+            parameters (list, optional): names of parameters, None for all
+            alternatives (list, optional): names of alternatives, None for all
+
+        Returns:
+            data (dict or ExportIndex): Dictionary mapping entity types to lists of exported rows
         """
+        _filters = tuple(None if x is None else frozenset(x) for x in (classes, parameters, alternatives))
+        if indexed and _filters in self._export_indexes:
+            return self._export_indexes[_filters]
         try:
-            _data_dict = export_functions.export_data(self._db_map)
+            _data_dict = export_functions.export_data(self._db_map, **self._export_ids(*_filters))
         except Exception as e:
-            self._handle_errors(e)
+            # there is no export to return
+            self._handle_errors([e])
+            raise
+        if indexed:
+            self._export_indexes[_filters] = ExportIndex(_data_dict)
+            return self._export_indexes[_filters]
         return _data_dict
 
+    def _export_ids(self, classes=None, parameters=None, alternatives=None) -> dict:
+        """Ids of the items to export per item type as keyword arguments for export_functions.export_data()
+
+        Item types that are not filtered are left out, i.e. exported entirely.
+        """
+        _db_map = self._db_map
+
+        def _ids(subquery, *criteria):
+            return {x.id for x in _db_map.query(subquery.c.id).filter(*criteria)}
+
+        _ids_dict = dict()
+        if classes is not None:
+            _object_class_ids = _ids(_db_map.object_class_sq, _db_map.object_class_sq.c.name.in_(classes))
+            _relationship_class_ids = _ids(
+                _db_map.wide_relationship_class_sq, _db_map.wide_relationship_class_sq.c.name.in_(classes)
+            )
+            _ids_dict.update(
+                object_class_ids=_object_class_ids,
+                relationship_class_ids=_relationship_class_ids,
+                object_ids=_ids(_db_map.object_sq, _db_map.object_sq.c.class_id.in_(_object_class_ids)),
+                object_group_ids=_ids(
+                    _db_map.entity_group_sq, _db_map.entity_group_sq.c.entity_class_id.in_(_object_class_ids)
+                ),
+                relationship_ids=_ids(
+                    _db_map.wide_relationship_sq, _db_map.wide_relationship_sq.c.class_id.in_(_relationship_class_ids)
+                ),
+            )
+        if alternatives is not None:
+            _ids_dict["alternative_ids"] = _ids(_db_map.alternative_sq, _db_map.alternative_sq.c.name.in_(alternatives))
+        if classes is None and parameters is None and alternatives is None:
+            return _ids_dict
+        for _definitions, _definition_sq, _values, _value_sq, _class_column in (
+                ("object_parameter_ids", _db_map.object_parameter_definition_sq,
+                 "object_parameter_value_ids", _db_map.object_parameter_value_sq, "object_class_name"),
+                ("relationship_parameter_ids", _db_map.relationship_parameter_definition_sq,
+                 "relationship_parameter_value_ids", _db_map.relationship_parameter_value_sq, "relationship_class_name"),
+        ):
+            _definition_criteria = list()
+            _value_criteria = list()
+            if classes is not None:
+                _definition_criteria.append(getattr(_definition_sq.c, _class_column).in_(classes))
+                _value_criteria.append(getattr(_value_sq.c, _class_column).in_(classes))
+            if parameters is not None:
+                _definition_criteria.append(_definition_sq.c.parameter_name.in_(parameters))
+                _value_criteria.append(_value_sq.c.parameter_name.in_(parameters))
+            if alternatives is not None:
+                _value_criteria.append(_value_sq.c.alternative_name.in_(alternatives))
+            if _definition_criteria:
+                _ids_dict[_definitions] = _ids(_definition_sq, *_definition_criteria)
+            _ids_dict[_values] = _ids(_value_sq, *_value_criteria)
+        return _ids_dict
+
     def _handle_errors(self, errors: list):
         for e in errors:
             logging.warning(e)
 
     def commit(self, message):
-        """Commit current changes
+        """Commit current changes, deferred to the end of an open bulk session
         """
+        if self._bulk_session is not None:
+            return None
+        self._export_indexes.clear()
         try:
             self._db_map.commit_session(message)
         except SpineDBAPIError as e:
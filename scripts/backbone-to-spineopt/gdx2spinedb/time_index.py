@@ -0,0 +1,82 @@
+"""Module defines a memoized service of time indexes and their time stamp labels shared by the builders
+"""
+
+import sys
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# number of time indexes kept, the least recently used ones are dropped beyond it
+MAX_CACHED = 64
+_cache = OrderedDict()
+
+
+class TimeIndex(NamedTuple):
+    """Time index with its time stamps formatted as by str(pandas.Timestamp), e.g. '2021-01-01 00:00:00'
+    """
+    index: pd.DatetimeIndex
+    labels: np.ndarray
+
+
+def _format_labels(_time_index) -> np.ndarray:
+    """Time stamps as an object array of interned strings, formatted in one vectorized call
+    """
+    _values = pd.DatetimeIndex(_time_index).values
+    _labels = np.char.replace(np.datetime_as_string(_values, unit="s"), "T", " ")
+    return np.array([sys.intern(x) for x in _labels.tolist()], dtype=object)
+
+
+def _date_range(year, relative_pos, full_year, leap, frequency) -> pd.DatetimeIndex:
+    if full_year:
+        start = pd.Timestamp(year=year, month=1, day=1, hour=0)
+        end = pd.Timestamp(year=year, month=12, day=31, hour=23)
+        full_year_range = pd.date_range(start, end, freq=frequency)
+        if all([year % 4 == 0, leap]):
+            return full_year_range[:8784]
+        # skip the leap day
+        full_year_range = full_year_range[~((full_year_range.month == 2) & (full_year_range.day == 29))]
+        return full_year_range[:8760]
+    start = pd.Timestamp(year=year, month=1, day=1, hour=0) + pd.to_timedelta(relative_pos[0], unit=frequency)
+    # Skip the leap day
+    if not leap and start >= pd.Timestamp(year=year, month=2, day=29):
+        start = start + pd.Timedelta(1, unit='d')
+    end = start + pd.to_timedelta(relative_pos[1], unit=frequency)
+    return pd.date_range(start, end, freq=frequency)
+
+
+def time_index(year, relative_pos=(0, 0), full_year=False, leap=False, frequency='H') -> TimeIndex:
+    """Memoized time index and its labels, see gdx2spinedb.import_ts.generate_time_index() for the arguments
+
+    The index and the labels are shared by all callers with the same arguments, the labels are read-only.
+
+    Returns:
+        time_index (TimeIndex)
+    """
+    _key = (year, tuple(relative_pos), full_year, leap, frequency)
+    _cached = _cache.get(_key)
+    if _cached is None:
+        _index = _date_range(year, relative_pos, full_year, leap, frequency)
+        _labels = _format_labels(_index)
+        _labels.flags.writeable = False
+        _cached = _cache[_key] = TimeIndex(_index, _labels)
+        if len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    _cache.move_to_end(_key)
+    return _cached
+
+
+def time_labels(_time_index) -> np.ndarray:
+    """Time stamp labels of a time index, taken from the memoized ones if the index comes from time_index()
+
+    Args:
+        _time_index (pandas.DatetimeIndex or list): time stamps
+
+    Returns:
+        labels (numpy.ndarray): an object array of strings, e.g. '2021-01-01 00:00:00'
+    """
+    for _cached in _cache.values():
+        if _cached.index is _time_index:
+            return _cached.labels
+    return _format_labels(_time_index)
@@ -0,0 +1,250 @@
+"""Module defines fixed- and variable-resolution time series values backed by NumPy arrays
+"""
+
+import numpy as np
+import pandas as pd
+from gdx2spinedb.time_index import time_labels
+
+# spinedb_api is imported where Spine values are created, the arrays and their compaction only need NumPy and pandas
+
+
+def _spine_resolution(resolution: pd.Timedelta) -> str:
+    """Resolution as a Spine duration string, e.g. '1h' or '15m'
+    """
+    _seconds = int(resolution.total_seconds())
+    if _seconds % 3600 == 0:
+        return f"{_seconds // 3600}h"
+    if _seconds % 60 == 0:
+        return f"{_seconds // 60}m"
+    return f"{_seconds}s"
+
+
+class ArrayTimeSeries(object):
+    """Time series with a start, a fixed resolution and float64 values
+
+    Builders create it in place of {"type": "time_series", "data": {time_stamp: value}, "index": {...}},
+    gdx2spinedb.spinedb.SpinedbIO writes it as a Spine fixed-resolution time series.
+    Example::
+
+        ArrayTimeSeries("2021-01-01 00:00:00", "1h", numpy.zeros(8760), repeat=True)
+    """
+
+    def __init__(self, start, resolution, values, repeat=False, ignore_year=False):
+        """
+        Args:
+            start (str or pandas.Timestamp): time stamp of the first value
+            resolution (str or pandas.Timedelta): time between two values, e.g. '1h'
+            values (numpy.ndarray or list): the values
+            repeat (bool): True if the time series repeats itself
+            ignore_year (bool): True if the time series applies to every year
+        """
+        self.start = pd.Timestamp(start)
+        self.resolution = pd.Timedelta(resolution)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.repeat = repeat
+        self.ignore_year = ignore_year
+
+    def __len__(self):
+        return len(self.values)
+
+    def __eq__(self, other):
+        if not isinstance(other, ArrayTimeSeries):
+            return NotImplemented
+        return all([
+            self.start == other.start, self.resolution == other.resolution, self.repeat == other.repeat,
+            self.ignore_year == other.ignore_year, np.array_equal(self.values, other.values)
+        ])
+
+    # mutable values, compared by content
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ArrayTimeSeries(start={self.start}, resolution={self.resolution}, length={len(self)})"
+
+    @property
+    def indexes(self) -> pd.DatetimeIndex:
+        """Time stamps of the values
+        """
+        return pd.date_range(self.start, periods=len(self.values), freq=self.resolution)
+
+    def scaled(self, factor):
+        """A new time series with the values multiplied by factor
+        """
+        return ArrayTimeSeries(self.start, self.resolution, self.values * factor, self.repeat, self.ignore_year)
+
+    def to_spine(self):
+        """The value as spinedb_api.parameter_value.TimeSeriesFixedResolution
+        """
+        from spinedb_api.parameter_value import TimeSeriesFixedResolution
+        return TimeSeriesFixedResolution(
+            self.start.isoformat(), _spine_resolution(self.resolution), self.values, self.ignore_year, self.repeat
+        )
+
+    def to_dict(self) -> dict:
+        """The value in the dictionary format of Spine time series with a time stamp per value
+        """
+        return {
+            "type": "time_series",
+            "data": dict(zip(time_labels(self.indexes).tolist(), self.values.tolist())),
+            "index": {"repeat": self.repeat, "ignore_year": self.ignore_year},
+        }
+
+
+class VariableTimeSeries(object):
+    """Time series with a time stamp per value, both in arrays, e.g. over a year that skips a leap day
+
+    The counterpart of ArrayTimeSeries for time indexes without a fixed resolution,
+    gdx2spinedb.spinedb.SpinedbIO writes it as a Spine variable-resolution time series.
+    Example::
+
+        VariableTimeSeries(pandas.DatetimeIndex(["2020-02-28", "2020-03-01"]), [1.0, 2.0], repeat=True)
+    """
+
+    def __init__(self, indexes, values, repeat=False, ignore_year=False):
+        """
+        Args:
+            indexes (pandas.DatetimeIndex or list): time stamp of each value
+            values (numpy.ndarray or list): the values
+            repeat (bool): True if the time series repeats itself
+            ignore_year (bool): True if the time series applies to every year
+        """
+        self.indexes = pd.DatetimeIndex(indexes)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.repeat = repeat
+        self.ignore_year = ignore_year
+
+    def __len__(self):
+        return len(self.values)
+
+    def __eq__(self, other):
+        if not isinstance(other, VariableTimeSeries):
+            return NotImplemented
+        return all([
+            self.repeat == other.repeat, self.ignore_year == other.ignore_year,
+            self.indexes.equals(other.indexes), np.array_equal(self.values, other.values)
+        ])
+
+    # mutable values, compared by content
+    __hash__ = None
+
+    def __repr__(self):
+        _start = self.indexes[0] if len(self) else None
+        return f"VariableTimeSeries(start={_start}, length={len(self)})"
+
+    def scaled(self, factor):
+        """A new time series with the values multiplied by factor
+        """
+        return VariableTimeSeries(self.indexes, self.values * factor, self.repeat, self.ignore_year)
+
+    def to_spine(self):
+        """The value as spinedb_api.parameter_value.TimeSeriesVariableResolution
+        """
+        from spinedb_api.parameter_value import TimeSeriesVariableResolution
+        return TimeSeriesVariableResolution(
+            self.indexes.values.astype("datetime64[s]"), self.values, self.ignore_year, self.repeat
+        )
+
+    def to_dict(self) -> dict:
+        """The value in the dictionary format of Spine time series with a time stamp per value
+        """
+        return {
+            "type": "time_series",
+            "data": dict(zip(time_labels(self.indexes).tolist(), self.values.tolist())),
+            "index": {"repeat": self.repeat, "ignore_year": self.ignore_year},
+        }
+
+
+def time_series_value(_time_index, values, repeat=False, ignore_year=False):
+    """Time series value for parameter value rows of gdx2spinedb.import_ts.SpineDBImporter
+
+    The values are aligned with the time index from the first element, the longer one is truncated as with zip().
+
+    :param _time_index: pandas DatetimeIndex or a list of time stamps, e.g. from gdx2spinedb.import_ts
+    :param values: a list or an array of values
+    :param repeat:
+    :param ignore_year:
+    :return: an ArrayTimeSeries if the time index has a fixed resolution,
+             a VariableTimeSeries otherwise, e.g. when a leap day is skipped or there is a single value,
+             a time series dictionary {"type": "time_series", "data": {}, ...} if there are no values
+    """
+    _values = np.asarray(values, dtype=np.float64)
+    _length = min(len(_time_index), len(_values))
+    _time_index = pd.DatetimeIndex(_time_index[:_length])
+    _values = _values[:_length]
+    if _length > 1:
+        _steps = np.diff(_time_index.values)
+        if np.all(_steps == _steps[0]):
+            return ArrayTimeSeries(_time_index[0], pd.Timedelta(_steps[0]), _values, repeat, ignore_year)
+    if _length > 0:
+        return VariableTimeSeries(_time_index, _values, repeat, ignore_year)
+    return {"type": "time_series", "data": {}, "index": {"repeat": repeat, "ignore_year": ignore_year}}
+
+
+def _month_pattern(value: ArrayTimeSeries):
+    """Time pattern of a time series over exactly one calendar year whose values change only between months,
+    None for other time series
+    """
+    _start = value.start
+    if _start != pd.Timestamp(year=_start.year, month=1, day=1):
+        return None
+    if _start + value.resolution * len(value) != pd.Timestamp(year=_start.year + 1, month=1, day=1):
+        return None
+    _values = value.values
+    _months = value.indexes.month.to_numpy()
+    _changes = np.flatnonzero(_values[1:] != _values[:-1]) + 1
+    if np.any(_months[_changes] == _months[_changes - 1]):
+        return None
+    # a pattern entry per run of months with the same value, e.g. 'M1-3'
+    _firsts = np.concatenate(([0], _changes))
+    _lasts = np.concatenate((_changes, [len(_values)])) - 1
+    _indexes = [
+        f"M{_months[a]}" if _months[a] == _months[b] else f"M{_months[a]}-{_months[b]}"
+        for a, b in zip(_firsts, _lasts)
+    ]
+    from spinedb_api.parameter_value import TimePattern
+    return TimePattern(_indexes, _values[_firsts])
+
+
+def compact_value(value):
+    """Value in its most compact equivalent form
+
+    Only repeating time series are compacted, since a scalar or a time pattern applies to every time step.
+    A repeating time series of one value, e.g. all zeros, becomes that value as a float.
+    A repeating ArrayTimeSeries over one calendar year that steps only between months becomes a Spine time pattern.
+    Other values are returned as they are.
+
+    :param value: a parameter value, e.g. an ArrayTimeSeries, a VariableTimeSeries or a time series dictionary
+    :return: the compacted value
+    """
+    if isinstance(value, (ArrayTimeSeries, VariableTimeSeries)):
+        _values = value.values
+        _repeat = value.repeat
+    elif isinstance(value, dict) and value.get("type") == "time_series" and isinstance(value.get("data"), dict):
+        _values = np.fromiter(value["data"].values(), dtype=np.float64, count=len(value["data"]))
+        _repeat = value.get("index", dict()).get("repeat", False)
+    else:
+        return value
+    if not _repeat or len(_values) == 0:
+        return value
+    if np.all(_values == _values[0]):
+        return float(_values[0])
+    if isinstance(value, ArrayTimeSeries):
+        _pattern = _month_pattern(value)
+        if _pattern is not None:
+            return _pattern
+    return value
+
+
+def to_spine_values(data, compact=False):
+    """Parameter value rows with ArrayTimeSeries and VariableTimeSeries converted to Spine time series
+
+    :param data: parameter value rows
+    :param compact: True to write time series in their compact form first, see compact_value()
+    """
+    if compact:
+        data = [tuple(row[:3]) + (compact_value(row[3]),) + tuple(row[4:]) for row in data]
+    return [
+        tuple(row[:3]) + (row[3].to_spine(),) + tuple(row[4:])
+        if isinstance(row[3], (ArrayTimeSeries, VariableTimeSeries)) else row
+        for row in data
+    ]
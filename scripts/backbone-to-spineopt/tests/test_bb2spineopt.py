@@ -0,0 +1,68 @@
+"""Unit tests for the batch conversions of bb2spineopt
+"""
+
+import random
+import unittest
+import pytest
+
+# the converters import the Spine database API and GDX2py through gdx2spinedb.io_config
+pytest.importorskip("spinedb_api")
+pytest.importorskip("gdx2py")
+from bb2spineopt import convert_nodes, convert_units
+from gdx2spinedb.import_ts import _COLLECTION_KEYS, generate_time_index
+
+
+def _backbone_export(n_units=12, seed=1):
+    """Export dictionary of a small Backbone model, units converting fuelA or fuelB to electricity at 75FI
+    """
+    rng = random.Random(seed)
+    _objects, _relationships, _object_values, _relationship_values = [], [], [], []
+    for i in range(n_units):
+        _unit = f"U{i}"
+        _objects.append(("unit", _unit))
+        _object_values.append(("unit", _unit, "unitCount", float(rng.randint(1, 3)), "Base"))
+        for _node, _io in [("75FI", "output"), (rng.choice(["fuelA", "fuelB"]), "input")]:
+            _relationships.append(("grid__node__unit__io", ["elec", _node, _unit, _io]))
+            for _parameter in ("capacity", "conversionCoeff", "vomCosts"):
+                _relationship_values.append(
+                    ("grid__node__unit__io", ["elec", _node, _unit, _io], _parameter, rng.random(), "Base")
+                )
+    _relationships += [("grid__node", ["elec", "75FI"]), ("grid__node", ["elec", "fuelA"])]
+    for _node in ("75FI", "fuelA", "fuelB"):
+        _relationship_values.append(("grid__node", ["elec", _node], "nodeBalance", 1, "Base"))
+        _relationship_values.append(("grid__node", ["elec", _node], "selfDischargeLoss", rng.random(), "Base"))
+    return {
+        "objects": _objects, "relationships": _relationships,
+        "object_parameter_values": _object_values, "relationship_parameter_values": _relationship_values,
+    }
+
+
+def _collections(importer):
+    return {name: repr(list(getattr(importer, name))) for name in _COLLECTION_KEYS}
+
+
+class TestParallelConversion(unittest.TestCase):
+    def setUp(self):
+        self.export = _backbone_export()
+        self.time_index = generate_time_index(2020, full_year=False, frequency="h")
+
+    def test_convert_units(self):
+        _specs = [("elec", node, f"U{i}", {"_p_unit": True}) for i in range(12) for node in ("75FI", "fuelA", "fuelB")]
+        _serial = _collections(convert_units(self.export, _specs, self.time_index))
+        for max_workers in (2, 3):
+            with self.subTest(max_workers=max_workers):
+                _parallel = convert_units(self.export, _specs, self.time_index, max_workers=max_workers)
+                self.assertEqual(_collections(_parallel), _serial)
+
+    def test_convert_nodes(self):
+        # repeated nodes, the first conversion of a node wins as in a serial conversion
+        _specs = [("elec", node) for node in ("75FI", "fuelA", "fuelB")] * 3
+        _serial = _collections(convert_nodes(self.export, _specs, self.time_index))
+        for max_workers in (2, 3):
+            with self.subTest(max_workers=max_workers):
+                _parallel = convert_nodes(self.export, _specs, self.time_index, max_workers=max_workers)
+                self.assertEqual(_collections(_parallel), _serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Unit tests for gdx2spinedb.columnar.ColumnarValues
+"""
+
+import pickle
+import random
+import unittest
+import numpy as np
+from gdx2spinedb.columnar import ColumnarValues
+from gdx2spinedb.keyed_list import KeyedList, parameter_value_key
+from gdx2spinedb.time_series import ArrayTimeSeries
+
+
+def _normalized(rows):
+    # entities of relationships come back from ColumnarValues as tuples
+    return [(x[0], x[1] if isinstance(x[1], str) else tuple(x[1])) + tuple(x[2:]) for x in rows]
+
+
+def _random_row(rng):
+    _entity = rng.choice(["n1", "n2", ["u1", "n1"], ["u2", "n2"]])
+    _class = "node" if isinstance(_entity, str) else "unit__to_node"
+    _value = rng.choice([
+        rng.random(), rng.randint(0, 9), "text", True,
+        ArrayTimeSeries("2021-01-01", "1h", [rng.random() for _ in range(rng.choice([3, 5]))]),
+    ])
+    return (_class, _entity, rng.choice(["p1", "p2"]), _value) + rng.choice([(), ("Base",), ("f00",)])
+
+
+class TestColumnarValues(unittest.TestCase):
+    def test_append_and_upsert_match_keyed_list(self):
+        rng = random.Random(0)
+        _keyed = KeyedList(parameter_value_key)
+        _columnar = ColumnarValues()
+        for _ in range(3000):
+            _row = _random_row(rng)
+            if rng.random() < 0.5:
+                _keyed.append(_row)
+                _columnar.append(_row)
+            else:
+                self.assertEqual(_keyed.upsert(_row), _columnar.upsert(_row))
+        self.assertEqual(len(_columnar), len(_keyed))
+        self.assertEqual(list(_columnar), _normalized(_keyed))
+
+    def test_take_keeps_keys(self):
+        _rows = [("node", "n1", "p1", 1.0, "Base"), ("node", "n2", "p1", 2.0, "Base")]
+        _keyed = KeyedList(parameter_value_key, _rows)
+        _columnar = ColumnarValues(_rows)
+        self.assertEqual(_columnar.take(), _normalized(_keyed.take()))
+        for _row in [("node", "n1", "p1", 3.0, "Base"), ("node", "n3", "p1", 4.0, "Base")]:
+            _keyed.append(_row)
+            _columnar.append(_row)
+        self.assertEqual(list(_columnar), _normalized(_keyed))
+        self.assertIn(("node", "n1", "p1", None, "Base"), _columnar)
+
+    def test_rows_do_not_share_storage(self):
+        _series = ArrayTimeSeries("2021-01-01", "1h", [1.0, 2.0, 3.0])
+        _columnar = ColumnarValues([("node", "n1", "p1", _series, "Base")])
+        _columnar[0][3].values[0] = 9.0
+        self.assertEqual(_columnar[0][3], _series)
+        _columnar.upsert(("node", "n1", "p1", _series.scaled(2.0), "Base"))
+        np.testing.assert_array_equal(_columnar[0][3].values, [2.0, 4.0, 6.0])
+
+    def test_replaced_series_reuse_storage(self):
+        _columnar = ColumnarValues()
+        for i in range(100):
+            _columnar.upsert(("node", "n1", "p1", ArrayTimeSeries("2021-01-01", "1h", [float(i)] * 4), "Base"))
+        _nbytes = _columnar.nbytes
+        for i in range(100):
+            _columnar.upsert(("node", "n1", "p1", ArrayTimeSeries("2021-01-01", "1h", [float(i)] * 4), "Base"))
+        self.assertEqual(_columnar.nbytes, _nbytes)
+
+    def test_pickle(self):
+        _rows = [("node", "n1", "p1", ArrayTimeSeries("2021-01-01", "1h", [1.0, 2.0]), "Base"),
+                 ("unit__to_node", ["u1", "n1"], "p2", "text", "f00")]
+        _columnar = ColumnarValues(_rows)
+        self.assertEqual(list(pickle.loads(pickle.dumps(_columnar))), list(_columnar))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Unit tests for the table mappings of gdx2spinedb.gdx_export
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pytest
+
+# the module builds Spine maps and reads GDX symbols
+pytest.importorskip("spinedb_api")
+pytest.importorskip("gdx2py")
+from gdx2spinedb.gdx_export import export_tables, load_mappings
+
+
+def _specification(table_name, components):
+    """Importer specification with one mapping of a table
+    """
+    return {"mapping": {"table_mappings": {table_name: [{"Mapping 0": {"mapping": components}}]}}}
+
+
+class TestPivotedMapping(unittest.TestCase):
+    def setUp(self):
+        # alternatives in the header, i.e. the column labels, and a value per node and alternative in the cells
+        _components = [
+            {"map_type": "ObjectClass", "value": "node", "skip_columns": ["comment"]},
+            {"map_type": "Object", "position": 0},
+            {"map_type": "ParameterDefinition", "value": "demand"},
+            {"map_type": "Alternative", "position": -1},
+            {"map_type": "ParameterValue"},
+        ]
+        _file, self.path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(_file, "w") as f:
+            json.dump(_specification("demand", _components), f)
+        self.table = pd.DataFrame({0: ["n1", "n2"], "f00": [1.0, 2.0], "f01": [3.0, 4.0], "comment": ["a", "b"]})
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_is_pivoted(self):
+        _mapping = load_mappings(self.path)["demand"][0]
+        self.assertTrue(_mapping.is_pivoted)
+        self.assertEqual(_mapping.alternative, ("header", 0))
+
+    def test_export_of_pivoted_table(self):
+        _export = export_tables(lambda name: self.table if name == "demand" else None, self.path)
+        self.assertEqual(_export["objects"], [("node", "n1", None), ("node", "n2", None)])
+        self.assertEqual(_export["alternatives"], [("f00", None), ("f01", None)])
+        self.assertEqual(_export["object_parameter_values"], [
+            ("node", "n1", "demand", 1.0, "f00"), ("node", "n2", "demand", 2.0, "f00"),
+            ("node", "n1", "demand", 3.0, "f01"), ("node", "n2", "demand", 4.0, "f01"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Unit tests for gdx2spinedb.keyed_list.KeyedList
+"""
+
+import pickle
+import unittest
+from gdx2spinedb.keyed_list import KeyedList, object_key, parameter_value_key, relationship_key
+
+
+class TestKeyedList(unittest.TestCase):
+    def test_append_keeps_first_row(self):
+        _objects = KeyedList(object_key, [("node", "n1", "first")])
+        _objects += [("node", "n1", "second"), ("node", "n2")]
+        self.assertEqual(list(_objects), [("node", "n1", "first"), ("node", "n2")])
+        self.assertIn(("node", "n1"), _objects)
+        self.assertNotIn(("node", "n3"), _objects)
+
+    def test_relationship_entities_as_lists_or_tuples(self):
+        _relationships = KeyedList(relationship_key, [("unit__to_node", ["u1", "n1"])])
+        _relationships.append(("unit__to_node", ("u1", "n1")))
+        self.assertEqual(len(_relationships), 1)
+        self.assertEqual(_relationships.position(("unit__to_node", ("u1", "n1"))), 0)
+
+    def test_upsert_replaces_in_place(self):
+        _values = KeyedList(parameter_value_key, [("node", "n1", "p1", 1.0), ("node", "n2", "p1", 2.0)])
+        # a row without an alternative has the key of the row in Base
+        self.assertTrue(_values.upsert(("node", "n1", "p1", 3.0, "Base")))
+        self.assertFalse(_values.upsert(("node", "n1", "p1", 4.0, "f00")))
+        self.assertEqual(
+            list(_values),
+            [("node", "n1", "p1", 3.0, "Base"), ("node", "n2", "p1", 2.0), ("node", "n1", "p1", 4.0, "f00")]
+        )
+
+    def test_take_keeps_keys(self):
+        _values = KeyedList(parameter_value_key, [("node", "n1", "p1", 1.0, "Base")])
+        self.assertEqual(_values.take(), [("node", "n1", "p1", 1.0, "Base")])
+        _values.append(("node", "n1", "p1", 2.0, "Base"))
+        self.assertEqual(list(_values), [])
+        self.assertIn(("node", "n1", "p1", None, "Base"), _values)
+        # upsert overrides the row taken
+        _values.upsert(("node", "n1", "p1", 3.0, "Base"))
+        self.assertEqual(list(_values), [("node", "n1", "p1", 3.0, "Base")])
+
+    def test_on_added(self):
+        _added = list()
+        _objects = KeyedList(object_key)
+        _objects.on_added = _added.append
+        _objects += [("node", "n1"), ("node", "n1"), ("node", "n2")]
+        _objects.upsert(("node", "n1", "description"))
+        self.assertEqual(_added, [("node", "n1"), ("node", "n2"), ("node", "n1", "description")])
+
+    def test_removal_reindexes(self):
+        _objects = KeyedList(object_key, [("node", "n1"), ("node", "n2"), ("node", "n3")])
+        del _objects[0]
+        self.assertEqual(_objects.position(("node", "n3")), 1)
+        self.assertNotIn(("node", "n1"), _objects)
+
+    def test_pickle(self):
+        _values = KeyedList(parameter_value_key, [("node", "n1", "p1", 1.0, "Base")])
+        _values.take()
+        _values.append(("node", "n2", "p1", 2.0, "Base"))
+        _copy = pickle.loads(pickle.dumps(_values))
+        self.assertEqual(list(_copy), list(_values))
+        self.assertIn(("node", "n1", "p1", None, "Base"), _copy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Unit tests for the compaction of time series values in gdx2spinedb.time_series
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+import pytest
+from gdx2spinedb.time_series import ArrayTimeSeries, VariableTimeSeries, _month_pattern, compact_value
+
+
+def _monthly_series(month_values, year=2021, repeat=True):
+    """Hourly ArrayTimeSeries over one calendar year with a value per month
+    """
+    _indexes = pd.date_range(f"{year}-01-01", f"{year + 1}-01-01", freq="h", inclusive="left")
+    _values = np.asarray(month_values, dtype=np.float64)[_indexes.month - 1]
+    return ArrayTimeSeries(_indexes[0], "1h", _values, repeat=repeat)
+
+
+class TestMonthPattern(unittest.TestCase):
+    def test_runs_of_months(self):
+        pytest.importorskip("spinedb_api")
+        _pattern = _month_pattern(_monthly_series([1, 1, 1, 2, 3, 3, 3, 3, 3, 3, 4, 4]))
+        self.assertEqual(list(_pattern.indexes), ["M1-3", "M4", "M5-10", "M11-12"])
+        np.testing.assert_array_equal(_pattern.values, [1.0, 2.0, 3.0, 4.0])
+
+    def test_change_within_a_month(self):
+        _series = _monthly_series(range(12))
+        _series.values[100] = -1.0
+        self.assertIsNone(_month_pattern(_series))
+
+    def test_not_one_calendar_year(self):
+        _series = _monthly_series(range(12))
+        self.assertIsNone(_month_pattern(ArrayTimeSeries("2021-01-02", "1h", _series.values)))
+        self.assertIsNone(_month_pattern(ArrayTimeSeries("2021-01-01", "1h", _series.values[:-1])))
+
+
+class TestCompactValue(unittest.TestCase):
+    def test_constant_repeating_series(self):
+        self.assertEqual(compact_value(ArrayTimeSeries("2021-01-01", "1h", [0.0] * 24, repeat=True)), 0.0)
+        _variable = VariableTimeSeries(pd.DatetimeIndex(["2020-02-28", "2020-03-01"]), [2.0, 2.0], repeat=True)
+        self.assertEqual(compact_value(_variable), 2.0)
+        _dict = {
+            "type": "time_series", "data": {"2021-01-01T00:00:00": 1.5, "2021-01-01T01:00:00": 1.5},
+            "index": {"repeat": True, "ignore_year": False},
+        }
+        self.assertEqual(compact_value(_dict), 1.5)
+
+    def test_monthly_repeating_series(self):
+        pytest.importorskip("spinedb_api")
+        _pattern = compact_value(_monthly_series(range(12)))
+        self.assertEqual(list(_pattern.indexes), [f"M{i}" for i in range(1, 13)])
+
+    def test_non_repeating_series(self):
+        # a scalar or a time pattern would apply to every year
+        for _series in [
+            ArrayTimeSeries("2021-01-01", "1h", [0.0] * 24),
+            VariableTimeSeries(pd.DatetimeIndex(["2020-02-28", "2020-03-01"]), [2.0, 2.0]),
+            _monthly_series(range(12), repeat=False),
+            {"type": "time_series", "data": {"2021-01-01T00:00:00": 1.5, "2021-01-01T01:00:00": 1.5}},
+        ]:
+            with self.subTest(value=_series):
+                self.assertIs(compact_value(_series), _series)
+
+    def test_other_values(self):
+        _series = ArrayTimeSeries("2021-01-01", "1h", [1.0, 2.0, 3.0], repeat=True)
+        self.assertIs(compact_value(_series), _series)
+        _empty = {"type": "time_series", "data": {}, "index": {"repeat": True}}
+        self.assertIs(compact_value(_empty), _empty)
+        self.assertEqual(compact_value("text"), "text")
+        self.assertEqual(compact_value(4.0), 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -92,34 +92,20 @@ class SpineOptPowerToXModule:
         if create_alternative:
             self._spinedb_importer.alternatives.append(active_alternative)
 
-        for k, v in enumerate(parameter):
+        for v in list(parameter):
             if v[2] == 'unit_capacity' and v[4] != active_alternative:
-                value_for_original_alternative = list(v)
-                value_for_original_alternative[3] = 0
-                value_for_original_alternative = tuple(value_for_original_alternative)
-                parameter[k] = value_for_original_alternative
-
-                value_for_active_alternative = list(v)
-                value_for_active_alternative[4] = active_alternative
-                value_for_active_alternative = tuple(value_for_active_alternative)
-                parameter.append(value_for_active_alternative)
-            else:
-                continue
+                # zero the value of the original alternative in place
+                self._spinedb_importer.upsert('relationship_parameter_values', tuple(v[:3]) + (0,) + tuple(v[4:]))
+                # a value already given for the active alternative is kept
+                parameter.append(tuple(v[:4]) + (active_alternative,) + tuple(v[5:]))
 
         parameter = self._spinedb_importer.object_parameter_values
-        for k, v in enumerate(parameter):
+        for v in list(parameter):
             if v[2] == 'demand' and v[4] != active_alternative:
-                value_for_original_alternative = list(v)
-                value_for_original_alternative[3] = 0
-                value_for_original_alternative = tuple(value_for_original_alternative)
-                parameter[k] = value_for_original_alternative
-
-                value_for_active_alternative = list(v)
-                value_for_active_alternative[4] = active_alternative
-                value_for_active_alternative = tuple(value_for_active_alternative)
-                parameter.append(value_for_active_alternative)
-            else:
-                continue
+                # zero the value of the original alternative in place
+                self._spinedb_importer.upsert('object_parameter_values', tuple(v[:3]) + (0,) + tuple(v[4:]))
+                # a value already given for the active alternative is kept
+                parameter.append(tuple(v[:4]) + (active_alternative,) + tuple(v[5:]))
         return None
 
     def import_to_spineopt(self, target_spineopt_db=None):
@@ -307,34 +293,34 @@ if __name__ == '__main__':
         default_alternative = active_alternative
         p2g.import_to_spineopt()
 
-        p2g.set_importer(SpineDBImporter())
+        p2g.set_importer(SpineDBImporter(columnar=True))
         p2g.conversion_process(
             'PtL', 'elec_to_H2', '75FI', 'elec', 'PtL_H2_tank', 'H2', alternative=default_alternative
         )
         p2g.import_to_spineopt()
 
-        p2g.set_importer(SpineDBImporter())
+        p2g.set_importer(SpineDBImporter(columnar=True))
         p2g.conversion_process(
             'PtL', 'gasoline_production', '75FI', 'elec', 'PtL_gasoline_tank', 'gasoline',
             alternative=default_alternative, fix_units_on=1.0
         )
         p2g.import_to_spineopt()
 
-        p2g.set_importer(SpineDBImporter())
+        p2g.set_importer(SpineDBImporter(columnar=True))
         p2g.conversion_process(
             'PtL', 'gasoline_production', 'PtL_H2_tank', 'H2', 'PtL_gasoline_tank', 'gasoline',
             alternative=default_alternative
         )
         p2g.import_to_spineopt()
 
-        p2g.set_importer(SpineDBImporter())
+        p2g.set_importer(SpineDBImporter(columnar=True))
         p2g.conversion_process(
             'PtL', 'gasoline_production', 'PtL_CO2_tank', 'Inflow_CO2', 'PtL_gasoline_tank', 'gasoline',
             alternative=default_alternative, fueling_input_node=True
         )
         p2g.import_to_spineopt()
 
-        p2g.set_importer(SpineDBImporter())
+        p2g.set_importer(SpineDBImporter(columnar=True))
         p2g.conversion_process(
             'PtL', 'gasoline_delivery', 'PtL_gasoline_tank', 'gasoline', 'transport_gasoline_station', 'gasoline',
             alternative=default_alternative, output_node_storage=False
@@ -18,6 +18,7 @@ from spineopt_structure import *
 from gdx2spinedb.io_config import open_spinedb
 from bb2spineopt import dummy_unit_for_node
 from gdx2spinedb.import_ts import SpineDBImporter, generate_time_index
+from gdx2spinedb.time_series import time_series_value
 
 
 def operating_time(func):
@@ -165,8 +166,7 @@ class SpineOptTransportModule:
     def time_index_year(self, leap=False, time_steps=None):
         year = self.year
         index = generate_time_index(year, relative_pos=(0, 0), full_year=True, leap=leap, frequency='H')
-        index = [str(x) for x in index[:time_steps]]
-        return index
+        return index[:time_steps]
 
     def ev_fleet_behaviour(self, ev_key: str = None, para_key: str = None, add_time_index=True):
         _skip = 1
@@ -209,34 +209,20 @@ class SpineOptTransportModule:
             self._spinedb_importer.alternatives.append(active_alternative)
 
         parameter = self._spinedb_importer.relationship_parameter_values
-        for k, v in enumerate(parameter):
+        for v in list(parameter):
             if v[2] == 'unit_capacity' and v[4] != active_alternative:
-                value_for_original_alternative = list(v)
-                value_for_original_alternative[3] = 0
-                value_for_original_alternative = tuple(value_for_original_alternative)
-                parameter[k] = value_for_original_alternative
-
-                value_for_active_alternative = list(v)
-                value_for_active_alternative[4] = active_alternative
-                value_for_active_alternative = tuple(value_for_active_alternative)
-                parameter.append(value_for_active_alternative)
-            else:
-                continue
+                # zero the value of the original alternative in place
+                self._spinedb_importer.upsert('relationship_parameter_values', tuple(v[:3]) + (0,) + tuple(v[4:]))
+                # a value already given for the active alternative is kept
+                parameter.append(tuple(v[:4]) + (active_alternative,) + tuple(v[5:]))
 
         parameter = self._spinedb_importer.object_parameter_values
-        for k, v in enumerate(parameter):
+        for v in list(parameter):
             if v[2] == 'demand' and v[4] != active_alternative:
-                value_for_original_alternative = list(v)
-                value_for_original_alternative[3] = 0
-                value_for_original_alternative = tuple(value_for_original_alternative)
-                parameter[k] = value_for_original_alternative
-
-                value_for_active_alternative = list(v)
-                value_for_active_alternative[4] = active_alternative
-                value_for_active_alternative = tuple(value_for_active_alternative)
-                parameter.append(value_for_active_alternative)
-            else:
-                continue
+                # zero the value of the original alternative in place
+                self._spinedb_importer.upsert('object_parameter_values', tuple(v[:3]) + (0,) + tuple(v[4:]))
+                # a value already given for the active alternative is kept
+                parameter.append(tuple(v[:4]) + (active_alternative,) + tuple(v[5:]))
         return None
 
     def import_to_spineopt(self, target_spineopt_db=None):
@@ -265,7 +251,7 @@ class SpineOptTransportModule:
         :return: a timeseries data with the fix_node_state parameter at the first hour of the modelling year
         """
         if not start_timestamp:
-            start_timestamp = self.time_index_year()[0]
+            start_timestamp = str(self.time_index_year()[0])
         else:
             start_timestamp = str(start_timestamp)
         if self.find_parameter_value(category='assumption', entity=f'{node_name}_start_state'):
@@ -301,10 +287,7 @@ class SpineOptTransportModule:
             _temp_importer.object_parameter_values.append(
                 (
                     'node', _utility_node_name, 'demand',
-                    {
-                        "type": "time_series", "data": demand_data.to_dict(),
-                        "index": {"repeat": self._timeseries_repeat}
-                    },
+                    time_series_value(demand_data.index, demand_data.values, repeat=self._timeseries_repeat),
                     alternative
                 )
             )
@@ -329,13 +312,13 @@ class SpineOptTransportModule:
             self.ev_fleet_behaviour(ev_key=vehicle_type, para_key='CONNECTED', add_time_index=True),
             self.find_parameter_value(category='number_of_cars', entity=vehicle_type),
             self.find_parameter_value(category='BATTERY_CAPACITY', entity=_battery_node_name)
-        ).to_dict()
+        )
         _temp_importer.object_parameter_values += [
             ('node', _battery_node_name, 'has_state', True, alternative),
             ('node', _battery_node_name, 'state_coeff', 1.0, alternative),
             (
                 'node', _battery_node_name, 'node_state_cap',
-                {"type": "time_series", "data": _node_state_cap, "index": {"repeat": self._timeseries_repeat}},
+                time_series_value(_node_state_cap.index, _node_state_cap.values, repeat=self._timeseries_repeat),
                 alternative
             ),
             ('node', _battery_node_name, 'fix_node_state', self._fix_node_start_state(_battery_node_name), alternative),
@@ -375,10 +358,9 @@ class SpineOptTransportModule:
         _temp_importer.object_parameter_values.append(
             (
                 'node', battery_node_name, 'demand',
-                {
-                    "type": "time_series", "data": _node_state_net_change.to_dict(),
-                    "index": {"repeat": self._timeseries_repeat}
-                },
+                time_series_value(
+                    _node_state_net_change.index, _node_state_net_change.values, repeat=self._timeseries_repeat
+                ),
                 alternative
             )
         )
@@ -404,10 +386,7 @@ class SpineOptTransportModule:
         _temp_importer.relationship_parameter_values.append(
             (
                 "unit__from_node", (_unit_name, _battery_node_name), 'fix_unit_flow',
-                {
-                    "type": "time_series", "data": elec_consumption.to_dict(),
-                    "index": {"repeat": self._timeseries_repeat}
-                },
+                time_series_value(elec_consumption.index, elec_consumption.values, repeat=self._timeseries_repeat),
                 alternative
             )
         )
@@ -429,7 +408,7 @@ class SpineOptTransportModule:
             ('unit_constraint', _unit_constraint, 'right_hand_side', 0, alternative),
             (
                 'unit', _unit_name, 'unit_availability_factor',
-                {"type": "time_series", "data": _availability.to_dict(), "index": {"repeat": self._timeseries_repeat}},
+                time_series_value(_availability.index, _availability.values, repeat=self._timeseries_repeat),
                 alternative
             ),
         ]
@@ -488,9 +467,7 @@ class SpineOptTransportModule:
         _unit_constraint = f'Eff_{_unit_name_1}'
 
         _availability = self.ev_fleet_behaviour(ev_key=vehicle_type, para_key='CONNECTED', add_time_index=True)
-        _availability = {
-            "type": "time_series", "data": _availability.to_dict(), "index": {"repeat": self._timeseries_repeat}
-        }
+        _availability = time_series_value(_availability.index, _availability.values, repeat=self._timeseries_repeat)
 
         elec_capacity_est = multiply(
             self.find_parameter_value(category='number_of_cars', entity=vehicle_type),
@@ -643,7 +620,7 @@ class SpineOptTransportModule:
             emission_name: str = None, alternative: str = 'Base', common_utility: bool = False
     ):
         if not self._spinedb_importer:
-            self.set_importer(SpineDBImporter())
+            self.set_importer(SpineDBImporter(columnar=True))
 
         _utility_node = f'transport_all_{utility}_use'
         _temp_importer, _station_node = self.fuel_station(energy_flow, alternative)
@@ -708,10 +685,9 @@ class SpineOptTransportModule:
             _hybrid_availability = 1 - self.ev_fleet_behaviour(
                 ev_key=vehicle_type, para_key='CONNECTED', add_time_index=True
             )
-            _hybrid_availability = {
-                "type": "time_series", "data": _hybrid_availability.to_dict(),
-                "index": {"repeat": self._timeseries_repeat}
-            }
+            _hybrid_availability = time_series_value(
+                _hybrid_availability.index, _hybrid_availability.values, repeat=self._timeseries_repeat
+            )
             _importer_hybrid = _hybrid_units_via_availability(
                 powertrain_1, 'to_node', powertrain_2, 'to_node', _unit_constraint,
                 utility_node, _hybrid_availability, alternative
@@ -730,7 +706,7 @@ class SpineOptTransportModule:
             fix_driving_distance_share: bool = True, fix_ev_use: bool = False, battery_discharge: bool = False
     ):
         if not self._spinedb_importer:
-            self.set_importer(SpineDBImporter())
+            self.set_importer(SpineDBImporter(columnar=True))
 
         self._spinedb_importer.objects.append(('commodity', fuel))
         self._spinedb_importer.relationships.append(('node__commodity', (source_node, fuel)))
@@ -749,9 +725,7 @@ class SpineOptTransportModule:
 
         if hybrid:
             _availability = 1 - self.ev_fleet_behaviour(ev_key=vehicle_type, para_key='CONNECTED', add_time_index=True)
-            _availability = {
-                "type": "time_series", "data": _availability.to_dict(), "index": {"repeat": self._timeseries_repeat}
-            }
+            _availability = time_series_value(_availability.index, _availability.values, repeat=self._timeseries_repeat)
 
             _temp_importer, _station_node = self.fuel_station(alternative_fuel, alternative)
             _temp_importer, _powertrain_icv = self.icv_engine(
@@ -781,25 +755,25 @@ if __name__ == '__main__':
             transport_module.add_alternative(active_alternative)
             transport_module.import_to_spineopt()
 
-        transport_module.set_importer(SpineDBImporter())
+        transport_module.set_importer(SpineDBImporter(columnar=True))
         transport_module.transport_utility('transport', active_alternative, 'BEV', 'PHEV', 'ICV_gasoline')
         transport_module.import_to_spineopt()
 
-        transport_module.set_importer(SpineDBImporter())
+        transport_module.set_importer(SpineDBImporter(columnar=True))
         transport_module.build_ev_profile(
             vehicle_type='BEV', utility='transport', fuel='elec', source_node='75FI',
             alternative=active_alternative, fix_ev_use=True, battery_discharge=True
         )
         transport_module.import_to_spineopt()
 
-        transport_module.set_importer(SpineDBImporter())
+        transport_module.set_importer(SpineDBImporter(columnar=True))
         transport_module.build_icv_profile(
             8 / 24, vehicle_type='ICV_gasoline', utility='transport', energy_flow='gasoline', emission_name='CO2',
             alternative=active_alternative
         )
         transport_module.import_to_spineopt()
 
-        transport_module.set_importer(SpineDBImporter())
+        transport_module.set_importer(SpineDBImporter(columnar=True))
         transport_module.build_ev_profile(
             vehicle_type='PHEV', utility='transport', fuel='elec', source_node='75FI',
             alternative=active_alternative, hybrid=True, alternative_fuel='gasoline',
@@ -8,6 +8,9 @@ import sys
 
 sys.path.append('.\\backbone-to-spineopt')
 from gdx2spinedb.import_ts import SpineDBImporter
+from gdx2spinedb.export_index import as_export_index
+from gdx2spinedb.time_series import time_series_value
+from spinedb_api.parameter_value import TimePattern
 
 
 def adapt_start_up_costs_of_units(
@@ -31,21 +34,17 @@ def adapt_start_up_costs_of_units(
     if new_alternative != search_alternative:
         _importer_spineopt.alternatives.append(new_alternative)
 
-    _original_db = _spineopt_db_export
-    _original_number_of_units = [
-        x[3] for x in _original_db['object_parameter_values']
-        if all([x[:3] == ('unit', _unit_name, 'number_of_units'), x[-1] == search_alternative])
-    ][0]
-    _original_unit_capacity = [
-        x[3] for x in _original_db['relationship_parameter_values']
-        if all([
-            x[:3] == ('unit__to_node', [_unit_name, _demand_node_name], 'unit_capacity'), x[-1] == search_alternative
-        ])
-    ][0]
-    _original_start_up_cost = [
-        x[3] for x in _original_db['object_parameter_values']
-        if all([x[:3] == ('unit', _unit_name, 'start_up_cost'), x[-1] == search_alternative])
-    ][0]
+    _original_db = as_export_index(_spineopt_db_export)
+    _original_number_of_units = _original_db.required_value(
+        'object_parameter_values', 'unit', _unit_name, 'number_of_units', search_alternative
+    )
+    _original_unit_capacity = _original_db.required_value(
+        'relationship_parameter_values', 'unit__to_node', [_unit_name, _demand_node_name], 'unit_capacity',
+        search_alternative
+    )
+    _original_start_up_cost = _original_db.required_value(
+        'object_parameter_values', 'unit', _unit_name, 'start_up_cost', search_alternative
+    )
 
     _new_unit_capacity = _new_total_capacity / _new_number_of_units
     _new_start_up_cost = _new_unit_capacity / _original_unit_capacity * _original_start_up_cost
@@ -55,15 +54,10 @@ def adapt_start_up_costs_of_units(
     ]
 
     if _unit_constraint:
-        _original_start_up_coefficient = [
-            x[3] for x in _original_db['relationship_parameter_values']
-            if all([
-                x[:3] == (
-                    'unit__unit_constraint', [_unit_name, _unit_constraint], 'units_started_up_coefficient'
-                ),
-                x[-1] == search_alternative
-            ])
-        ][0]
+        _original_start_up_coefficient = _original_db.required_value(
+            'relationship_parameter_values', 'unit__unit_constraint', [_unit_name, _unit_constraint],
+            'units_started_up_coefficient', search_alternative
+        )
 
         _new_start_up_coefficient = _new_unit_capacity / _original_unit_capacity * _original_start_up_coefficient
         _importer_spineopt.relationship_parameter_values += [
@@ -98,27 +92,23 @@ def modify_generation_capacity_of_units(
     if new_alternative != search_alternative:
         _importer_spineopt.alternatives.append(new_alternative)
 
-    _original_db = _spineopt_db_export
-    _original_number_of_units = [
-        x[3] for x in _original_db['object_parameter_values']
-        if all([x[:3] == ('unit', _unit_name, 'number_of_units'), x[-1] == search_alternative])
-    ][0]
-    _original_unit_capacity = [
-        x[3] for x in _original_db['relationship_parameter_values']
-        if all([
-            x[:3] == ('unit__to_node', [_unit_name, _demand_node_name], 'unit_capacity'), x[-1] == search_alternative
-        ])
-    ][0]
+    _original_db = as_export_index(_spineopt_db_export)
+    _original_number_of_units = _original_db.required_value(
+        'object_parameter_values', 'unit', _unit_name, 'number_of_units', search_alternative
+    )
+    _original_unit_capacity = _original_db.required_value(
+        'relationship_parameter_values', 'unit__to_node', [_unit_name, _demand_node_name], 'unit_capacity',
+        search_alternative
+    )
     _original_total_capacity = _original_unit_capacity * _original_number_of_units
 
     if _new_number_of_units:
         _number_of_units = _new_number_of_units
         # renew fix_units_on w.r.t. the new number of units if there is such in the original database
-        fix_units_on = [
-            x[3] for x in _spineopt_db_export['object_parameter_values']
-            if all([x[:3] == ('unit', _unit_name, 'fix_units_on'), x[-1] == search_alternative])
-        ]
-        if fix_units_on:
+        fix_units_on = _original_db.value(
+            'object_parameter_values', 'unit', _unit_name, 'fix_units_on', search_alternative
+        )
+        if fix_units_on is not None:
             _importer_spineopt.object_parameter_values.append(
                 ('unit', _unit_name, 'fix_units_on', _number_of_units, new_alternative)
             )
@@ -127,22 +117,24 @@ def modify_generation_capacity_of_units(
     _unit_capacity = _new_total_capacity / _number_of_units
 
     if _source_node_name:
-        _original_source_flow_value = [
-            x[3] for x in _original_db['object_parameter_values']
-            if all([x[:3] == ('node', _source_node_name, 'demand'), x[-1] == search_alternative])
-        ][0].to_dict()
-
-        _new_source_flow = {
-            k: v * _new_total_capacity / _original_total_capacity for k, v in
-            _original_source_flow_value['data'].items()
-        }
-
-        if 'index' in _original_source_flow_value.keys():
-            _new_source_flow_value = {
-                "type": "time_series", "data": _new_source_flow, "index": _original_source_flow_value['index']
-            }
+        # an exported time series, of either fixed or variable resolution, or its compact form
+        _original_source_flow_value = _original_db.required_value(
+            'object_parameter_values', 'node', _source_node_name, 'demand', search_alternative
+        )
+
+        _scale = _new_total_capacity / _original_total_capacity
+        if isinstance(_original_source_flow_value, (int, float)):
+            # a constant time series written as a scalar, see gdx2spinedb.time_series.compact_value()
+            _new_source_flow_value = _original_source_flow_value * _scale
+        elif isinstance(_original_source_flow_value, TimePattern):
+            _new_source_flow_value = TimePattern(
+                _original_source_flow_value.indexes, _original_source_flow_value.values * _scale
+            )
         else:
-            _new_source_flow_value = {"type": "time_series", "data": _new_source_flow}
+            _new_source_flow_value = time_series_value(
+                _original_source_flow_value.indexes, _original_source_flow_value.values * _scale,
+                repeat=_original_source_flow_value.repeat, ignore_year=_original_source_flow_value.ignore_year
+            )
 
         _importer_spineopt.object_parameter_values.append(
             ('node', _source_node_name, 'demand', _new_source_flow_value, new_alternative)
@@ -273,9 +273,7 @@ def set_scenarios(_target_spineopt_db=None, *scenarios):
     :param scenarios: instances of gdx2spinedb.import_ts.SpineDBImporter, acquired via build_scenario()
     :return:
     """
-    _temp_importer = SpineDBImporter()
-    for scenario in scenarios:
-        _temp_importer += scenario
+    _temp_importer = SpineDBImporter.merge(*scenarios)
 
     if _target_spineopt_db:
         _temp_importer.import_data(_target_spineopt_db)
@@ -361,6 +359,6 @@ if __name__ == "__main__":
     set_scenarios(spineopt_model_db, scenario_base, scenarios_base_transport)
 
     # build default model objects
-    target_db = spineopt_model_db.export_spinedb()
+    target_db = spineopt_model_db.export_spinedb(classes=["model"])
     model_names = [x[1] for x in target_db["objects"] if x[0] == "model"]
     importer_spineopt = default_report_output(spineopt_model_db, model_names[0])